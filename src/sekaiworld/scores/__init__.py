@@ -8,6 +8,8 @@ from .notes import *
 from .types import *
 
 from .score import *
+from .tempo import *
+from .cache import *
 from .drawing import *
 from .rebase import *
 from .lyric import *
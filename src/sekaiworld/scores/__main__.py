@@ -1,9 +1,19 @@
 import os
+import sys
+import json
+import time
+import typing
 import argparse
+import traceback
+import dataclasses
+import concurrent.futures
 
 from .__init__ import *
 
 
+DEFAULT_NOTE_HOST = 'https://asset3.pjsekai.moe/live/note/custom01'
+
+
 class Main:
     def __init__(self):
         self.input: str = None
@@ -21,45 +31,72 @@ class Main:
         parser.add_argument('--rebase', metavar='<xxx.json>', help='customized bpm, beats and sections')
         parser.add_argument('--lyric', metavar='<xxx.txt>', help='lyrics')
         parser.add_argument('--css', metavar='<xxx.css>', help='style sheets')
+        parser.add_argument('--cache', metavar='<dir>', help='the dir of compiled score cache files (.susc)')
         parser.add_argument('--note-host', dest='note_host', metavar='<url>',
-                            default='https://asset3.pjsekai.moe/live/note/custom01',
+                            default=DEFAULT_NOTE_HOST,
                             help='the base dir of asset files for notes')
 
         parser.add_argument('-o', '--output', metavar='<xxx.svg>')
         args = parser.parse_args()
 
+        css = ''
+        if args.css:
+            with open(args.css, encoding='UTF-8') as f:
+                css = f.read()
+
+        return cls.load(
+            score=args.score,
+            output=args.output,
+            rebase=args.rebase,
+            lyric=args.lyric,
+            css=css,
+            note_host=args.note_host,
+            cache=args.cache,
+        )
+
+    @classmethod
+    def load(
+        cls,
+        score: str,
+        output: str | None = None,
+        rebase: str | None = None,
+        lyric: str | None = None,
+        css: str = '',
+        note_host: str = DEFAULT_NOTE_HOST,
+        cache: str | None = None,
+    ) -> 'Main':
         self = cls()
-        self.input = os.path.abspath(args.score)
+        self.input = os.path.abspath(score)
 
-        if args.output:
-            if os.path.isdir(args.output):
+        if output:
+            if os.path.isdir(output):
                 self.output = os.path.join(
-                    os.path.dirname(args.output),
+                    os.path.dirname(output),
                     os.path.splitext(self.input)[0] + '.svg',
                 )
             else:
-                self.output = str(args.output)
+                self.output = str(output)
         else:
             self.output = os.path.join(
                 os.path.dirname(self.input),
                 os.path.splitext(self.input)[0] + '.svg',
             )
 
-        self.score = Score.open(args.score, encoding='UTF-8')
+        if cache:
+            self.score = ScoreCache(cache).open(score, encoding='UTF-8')
+        else:
+            self.score = Score.open(score, encoding='UTF-8')
 
-        if args.rebase:
-            with open(args.rebase, encoding='UTF-8') as f:
+        if rebase:
+            with open(rebase, encoding='UTF-8') as f:
                 self.rebase = Rebase.load(f)
 
-        if args.lyric:
-            with open(args.lyric, encoding='UTF-8') as f:
+        if lyric:
+            with open(lyric, encoding='UTF-8') as f:
                 self.lyric = Lyric.load(f)
 
-        if args.css:
-            with open(args.css, encoding='UTF-8') as f:
-                self.css = f.read()
-
-        self.note_host = args.note_host
+        self.css = css
+        self.note_host = note_host
 
         return self
 
@@ -72,5 +109,166 @@ class Main:
         d.svg().saveas(self.output)
 
 
+@dataclasses.dataclass
+class Job:
+    score: str
+    output: str | None = None
+    rebase: str | None = None
+    lyric: str | None = None
+
+    # the fields naming files, relative to the manifest in one
+    paths: typing.ClassVar[tuple[str, ...]] = ('score', 'output', 'rebase', 'lyric')
+
+
+class Batch:
+    '''
+    Render many scores with a pool of worker processes.
+
+    Jobs come from a directory (every *.sus in it) or a JSON manifest, a list
+    of {"score", "output", "rebase", "lyric"} objects whose relative paths are
+    resolved against the manifest's directory. A failing job is reported and
+    does not stop the others.
+    '''
+
+    def __init__(self):
+        self.jobs: list[Job] = []
+        self.workers: int | None = None
+        self.note_host: str = DEFAULT_NOTE_HOST
+        self.css: str = ''
+        self.cache: str | None = None
+
+    @classmethod
+    def from_args(cls, argv: list[str] | None = None) -> 'Batch':
+        parser = argparse.ArgumentParser(prog='python -m sekaiworld.scores batch')
+        parser.add_argument('input', metavar='<dir|manifest.json>',
+                            help='a dir of pjsekai score files, or a manifest of jobs')
+        parser.add_argument('-j', '--jobs', dest='workers', metavar='<n>', type=_positive_int,
+                            help='the number of worker processes (default: cpu count)')
+        parser.add_argument('--css', metavar='<xxx.css>', help='style sheets')
+        parser.add_argument('--cache', metavar='<dir>', help='the dir of compiled score cache files (.susc)')
+        parser.add_argument('--note-host', dest='note_host', metavar='<url>',
+                            default=DEFAULT_NOTE_HOST,
+                            help='the base dir of asset files for notes')
+        parser.add_argument('-o', '--output', metavar='<dir>',
+                            help='the dir of output images (default: next to each score)')
+        args = parser.parse_args(argv)
+
+        self = cls()
+        if os.path.isdir(args.input):
+            self.jobs = [
+                Job(score=os.path.join(args.input, name))
+                for name in sorted(os.listdir(args.input))
+                if name.endswith('.sus')
+            ]
+        else:
+            try:
+                self.jobs = cls.load_manifest(args.input)
+            except OSError as e:
+                parser.error(f'cannot read manifest {args.input}: {e.strerror or e}')
+            except ValueError as e:
+                parser.error(str(e))
+
+        if args.output:
+            os.makedirs(args.output, exist_ok=True)
+            for job in self.jobs:
+                if job.output is None:
+                    job.output = os.path.join(
+                        args.output,
+                        os.path.splitext(os.path.basename(job.score))[0] + '.svg',
+                    )
+
+        if args.css:
+            with open(args.css, encoding='UTF-8') as f:
+                self.css = f.read()
+
+        self.workers = args.workers
+        self.note_host = args.note_host
+        self.cache = args.cache
+
+        return self
+
+    @classmethod
+    def load_manifest(cls, file: str) -> list[Job]:
+        with open(file, encoding='UTF-8') as f:
+            items = json.load(f)
+
+        base = os.path.dirname(os.path.abspath(file))
+        keys = {field.name for field in dataclasses.fields(Job)}
+
+        jobs = []
+        for i, item in enumerate(items):
+            if not isinstance(item, dict) or 'score' not in item:
+                raise ValueError(f'{file}: job {i} has no "score": {item!r}')
+
+            for key, value in item.items():
+                if key not in keys:
+                    raise ValueError(f'{file}: job {i} has an unknown key {key!r}: {item!r}')
+                if key in Job.paths and value is not None and not isinstance(value, str):
+                    raise ValueError(f'{file}: job {i} has a {key!r} that is not a path: {item!r}')
+
+            jobs.append(Job(**{
+                key: os.path.join(base, value) if key in Job.paths and value else value
+                for key, value in item.items()
+            }))
+
+        return jobs
+
+    def __call__(self) -> int:
+        n_failed = 0
+        t = time.perf_counter()
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(_render_job, job, self.css, self.note_host, self.cache): job
+                for job in self.jobs
+            }
+            for future in concurrent.futures.as_completed(futures):
+                job = futures[future]
+                try:
+                    elapsed, error = future.result()
+                except Exception as e:
+                    elapsed, error = 0.0, ''.join(traceback.format_exception_only(e)).strip()
+
+                if error is None:
+                    print(f'ok    {elapsed:7.2f}s  {job.score}')
+                else:
+                    n_failed += 1
+                    print(f'FAIL  {elapsed:7.2f}s  {job.score}: {error}')
+
+        print(f'{len(self.jobs) - n_failed}/{len(self.jobs)} rendered in {time.perf_counter() - t:.2f}s')
+        return 1 if n_failed else 0
+
+
+def _positive_int(s: str) -> int:
+    try:
+        n = int(s)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'not a number: {s}') from None
+    if n < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1: {s}')
+    return n
+
+
+def _render_job(job: Job, css: str, note_host: str, cache: str | None) -> tuple[float, str | None]:
+    t = time.perf_counter()
+    try:
+        Main.load(
+            score=job.score,
+            output=job.output,
+            rebase=job.rebase,
+            lyric=job.lyric,
+            css=css,
+            note_host=note_host,
+            cache=cache,
+        )()
+    except Exception as e:
+        return time.perf_counter() - t, ''.join(traceback.format_exception_only(e)).strip()
+
+    return time.perf_counter() - t, None
+
+
 if __name__ == '__main__':
+    if sys.argv[1:2] == ['batch']:
+        sys.exit(Batch.from_args(sys.argv[2:])())
+
     Main.from_args()()
@@ -0,0 +1,117 @@
+import math
+import dataclasses
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        'sekaiworld.scores needs numpy for note arrays and batch time conversion, '
+        'install it with the arrays extra: pip install "sekaiworld.scores[arrays]"'
+    ) from e
+
+from .notes import *
+from .types import *
+
+__all__ = ['NoteArrays']
+
+KINDS = (Tap, Directional, Slide)
+
+
+@dataclasses.dataclass
+class NoteArrays:
+    '''
+    Struct-of-arrays view of every note of a score (see `Score.all_notes`).
+
+    Row i of every column describes the same note. The first `n_listed` rows
+    are `Score.notes`, the rest are notes only reachable through links. Links
+    are row indexes into the same table, -1 for none. `kind` indexes `KINDS`.
+    '''
+
+    bar_numerator: np.ndarray  # int64
+    bar_denominator: np.ndarray  # int64
+    time: np.ndarray  # float64, seconds
+    lane: np.ndarray  # int32
+    width: np.ndarray  # int32
+    type: np.ndarray  # int32
+    speed: np.ndarray  # float64, nan for none
+    kind: np.ndarray  # int8
+    channel: np.ndarray  # int32
+    decoration: np.ndarray  # bool
+    tap: np.ndarray  # int32
+    directional: np.ndarray  # int32
+    next: np.ndarray  # int32
+    head: np.ndarray  # int32
+    flags: np.ndarray  # int16, see `NoteFlags`
+    n_listed: int
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    @property
+    def bar(self) -> np.ndarray:
+        return self.bar_numerator / self.bar_denominator
+
+    @classmethod
+    def from_score(cls, score) -> 'NoteArrays':
+        notes: list[Note] = score.all_notes()
+        indexes: dict[int, int] = {id(note): i for i, note in enumerate(notes)}
+
+        def links(key: str) -> np.ndarray:
+            return np.fromiter((
+                indexes[id(link)] if (link := getattr(note, key, None)) is not None else -1
+                for note in notes
+            ), dtype=np.int32, count=len(notes))
+
+        def column(f, dtype) -> np.ndarray:
+            return np.fromiter(map(f, notes), dtype=dtype, count=len(notes))
+
+        return cls(
+            bar_numerator=column(lambda note: note.bar.numerator, np.int64),
+            bar_denominator=column(lambda note: note.bar.denominator, np.int64),
+            time=column(lambda note: score.get_time(note.bar), np.float64),
+            lane=column(lambda note: note.lane, np.int32),
+            width=column(lambda note: note.width, np.int32),
+            type=column(lambda note: note.type, np.int32),
+            speed=column(lambda note: np.nan if note.speed is None else note.speed, np.float64),
+            kind=column(lambda note: KINDS.index(type(note)), np.int8),
+            channel=column(lambda note: getattr(note, 'channel', 0), np.int32),
+            decoration=column(lambda note: getattr(note, 'decoration', False), np.bool_),
+            tap=links('tap'),
+            directional=links('directional'),
+            next=links('next'),
+            head=links('head'),
+            flags=column(lambda note: note.flags if note.flags is not None else NoteFlags.of(note), np.int16),
+            n_listed=len(score.notes),
+        )
+
+    def to_notes(self) -> list[Note]:
+        '''
+        Rebuild the linked note objects, returning the first `n_listed`.
+        '''
+        notes: list[Note] = []
+        for bar_numerator, bar_denominator, lane, width, type, speed, kind, channel, decoration in zip(
+            self.bar_numerator.tolist(), self.bar_denominator.tolist(),
+            self.lane.tolist(), self.width.tolist(), self.type.tolist(),
+            self.speed.tolist(), self.kind.tolist(),
+            self.channel.tolist(), self.decoration.tolist(),
+        ):
+            note_class = KINDS[kind]
+            kwargs = dict(channel=channel, decoration=decoration) if note_class is Slide else {}
+            notes.append(note_class(
+                bar=Fraction(bar_numerator, bar_denominator),
+                lane=lane,
+                width=width,
+                type=type,
+                speed=None if math.isnan(speed) else speed,
+                **kwargs,
+            ))
+
+        for key in ('tap', 'directional', 'next', 'head'):
+            for i, j in enumerate(getattr(self, key).tolist()):
+                if j >= 0:
+                    setattr(notes[i], key, notes[j])
+
+        for note in notes:
+            note.flags = NoteFlags.of(note)
+
+        return notes[:self.n_listed]
@@ -0,0 +1,332 @@
+import os
+import json
+import math
+import mmap
+import struct
+import hashlib
+import collections
+import importlib.metadata
+
+from .notes import *
+from .types import *
+
+from .score import *
+from .meta import *
+from .line import TicksPerBeat
+
+__all__ = ['ScoreCache', 'SentenceCache']
+
+
+class ScoreCache:
+    '''
+    Compiled score cache (.susc).
+
+    A fully linked `Score` is stored as fixed-size binary records, with links
+    between notes stored as indices, so loading skips text parsing and note
+    linking entirely. Entries are keyed by a hash of the source file and the
+    library version and the encoding it is read with; an entry that does not
+    match is rebuilt from the source.
+    '''
+
+    magic = b'SUSC'
+    format_version = 1
+
+    suffix = '.susc'
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @classmethod
+    def key(cls, source: bytes, encoding: str = 'UTF-8') -> bytes:
+        h = hashlib.sha256()
+        h.update(f'{_library_version()}/{cls.format_version}/{encoding.lower()}\0'.encode())
+        h.update(source)
+        return h.digest()
+
+    def path(self, key: bytes) -> str:
+        return os.path.join(self.directory, key.hex() + self.suffix)
+
+    def open(self, file: str, encoding: str = 'UTF-8') -> Score:
+        with open(file, 'rb') as f:
+            source = f.read()
+
+        key = self.key(source, encoding)
+        path = self.path(key)
+
+        try:
+            return self.load(path, key=key)
+        except _load_errors:
+            pass
+
+        score = Score.from_bytes(source, encoding=encoding)
+
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp, 'wb') as f:
+                self.dump(score, f, key=key)
+            os.replace(tmp, path)
+        except (OSError, TypeError, struct.error):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        return score
+
+    @classmethod
+    def dump(cls, score: Score, f, key: bytes = b''):
+        notes = score.all_notes()
+        indexes: dict[int, int] = {id(note): i for i, note in enumerate(notes)}
+
+        def index(note: Note | None) -> int:
+            return -1 if note is None else indexes[id(note)]
+
+        note_records = []
+        for note in notes:
+            tap = index(getattr(note, 'tap', None))
+            directional = index(getattr(note, 'directional', None))
+            next = index(getattr(note, 'next', None))
+            head = index(getattr(note, 'head', None))
+
+            note_records.append(_note_record.pack(
+                note.bar.numerator, note.bar.denominator,
+                note.lane, note.width, note.type,
+                math.nan if note.speed is None else note.speed,
+                _note_kinds.index(type(note)),
+                getattr(note, 'channel', 0),
+                getattr(note, 'decoration', False),
+                tap, directional, next, head,
+            ))
+
+        strings: list[str] = []
+        event_records = []
+        for event in score.events:
+            flags = 0
+            for bit, value in enumerate((event.bpm, event.bar_length, event.sentence_length, event.speed)):
+                if value is not None:
+                    flags |= 1 << bit
+            if isinstance(event.bar, int):
+                flags |= 1 << 4
+
+            bpm = Fraction(event.bpm or 0)
+            bar_length = Fraction(event.bar_length or 0)
+            event_records.append(_event_record.pack(
+                Fraction(event.bar).numerator, Fraction(event.bar).denominator,
+                bpm.numerator, bpm.denominator,
+                bar_length.numerator, bar_length.denominator,
+                event.sentence_length or 0,
+                event.speed or 0.0,
+                flags,
+                _string_index(strings, event.section),
+                _string_index(strings, event.text),
+            ))
+
+        extra = json.dumps({
+            'meta': vars(score.meta),
+            'strings': strings,
+            'ticks_per_beat': getattr(score, 'ticks_per_beat', None),
+        }, ensure_ascii=False).encode('UTF-8')
+
+        f.write(_header.pack(
+            cls.magic, cls.format_version, key,
+            len(score.notes), len(note_records), len(event_records), len(extra),
+        ))
+        f.write(b''.join(note_records))
+        f.write(b''.join(event_records))
+        f.write(extra)
+
+    @classmethod
+    def load(cls, file: str, key: bytes | None = None) -> Score:
+        with (
+            open(file, 'rb') as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m,
+            memoryview(m) as buf,
+        ):
+            return cls._load_from_buffer(buf, key=key)
+
+    @classmethod
+    def _load_from_buffer(cls, buf: memoryview, key: bytes | None = None) -> Score:
+        magic, format_version, stored_key, n_listed, n_notes, n_events, n_extra = _header.unpack_from(buf)
+        if magic != cls.magic or format_version != cls.format_version:
+            raise ValueError('not a compiled score of this format version')
+        if key is not None and stored_key != key:
+            raise ValueError('compiled score is stale')
+
+        offset = _header.size
+        note_end = offset + _note_record.size * n_notes
+        event_end = note_end + _event_record.size * n_events
+        if len(buf) != event_end + n_extra:
+            raise ValueError('compiled score is truncated')
+
+        # every view into the buffer is released before returning, so that
+        # `load` can close the mapping, also when the records are broken
+        with buf[event_end:] as records:
+            extra = json.loads(bytes(records).decode('UTF-8'))
+        if not (
+            isinstance(extra, dict) and
+            isinstance(extra.get('meta'), dict) and
+            isinstance(extra.get('strings'), list) and
+            all(isinstance(s, str) for s in extra['strings']) and
+            'ticks_per_beat' in extra and isinstance(extra['ticks_per_beat'], int | None)
+        ):
+            raise ValueError('compiled score has a broken extra block')
+        strings: list[str] = extra['strings']
+
+        notes: list[Note] = []
+        links: list[tuple[int, int, int, int]] = []
+        with buf[offset:note_end] as records:
+            note_records = list(_note_record.iter_unpack(records))
+
+        for (
+            bar_numerator, bar_denominator, lane, width, type, speed,
+            kind, channel, decoration, tap, directional, next, head,
+        ) in note_records:
+            note_class = _note_kinds[kind]
+            kwargs = dict(channel=channel, decoration=bool(decoration)) if note_class is Slide else {}
+            notes.append(note_class(
+                bar=Fraction(bar_numerator, bar_denominator),
+                lane=lane,
+                width=width,
+                type=type,
+                speed=None if math.isnan(speed) else speed,
+                **kwargs,
+            ))
+            links.append((tap, directional, next, head))
+
+        for note, (tap, directional, next, head) in zip(notes, links):
+            if tap >= 0:
+                note.tap = notes[tap]
+            if directional >= 0:
+                note.directional = notes[directional]
+            if next >= 0:
+                note.next = notes[next]
+            if head >= 0:
+                note.head = notes[head]
+
+        for note in notes:
+            note.flags = NoteFlags.of(note)
+
+        with buf[note_end:event_end] as records:
+            event_records = list(_event_record.iter_unpack(records))
+
+        events: list[Event] = []
+        for (
+            bar_numerator, bar_denominator, bpm_numerator, bpm_denominator,
+            bar_length_numerator, bar_length_denominator, sentence_length, speed,
+            flags, section, text,
+        ) in event_records:
+            events.append(Event(
+                bar=bar_numerator if flags & 16 else Fraction(bar_numerator, bar_denominator),
+                bpm=Fraction(bpm_numerator, bpm_denominator) if flags & 1 else None,
+                bar_length=Fraction(bar_length_numerator, bar_length_denominator) if flags & 2 else None,
+                sentence_length=sentence_length if flags & 4 else None,
+                speed=speed if flags & 8 else None,
+                section=strings[section] if section >= 0 else None,
+                text=strings[text] if text >= 0 else None,
+            ))
+
+        score = Score()
+        score.meta = Meta(**extra['meta'])
+        score.notes = notes[:n_listed]
+        score.events = events
+        if extra['ticks_per_beat'] is not None:
+            score.ticks_per_beat = TicksPerBeat(extra['ticks_per_beat'])
+
+        return score
+
+
+class SentenceCache:
+    '''
+    Drawn sentences, keyed by a hash of everything a sentence is drawn from.
+
+    Recently used entries are kept in memory, up to `cache_size`; with a
+    `directory`, every entry is also stored there and outlives the process.
+    An entry is the markup inside the <svg> of a sentence, which does not
+    depend on where the sentence is placed.
+    '''
+
+    format_version = 1
+
+    suffix = '.svgpart'
+
+    def __init__(self, directory: str | None = None, cache_size: int = 256):
+        self.directory = directory
+        self.cache_size = cache_size
+        self.entries: collections.OrderedDict[str, str] = collections.OrderedDict()
+
+    @classmethod
+    def key(cls, content: tuple) -> str:
+        h = hashlib.sha256()
+        h.update(f'{_library_version()}/{cls.format_version}\0'.encode())
+        h.update(repr(content).encode())
+        return h.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key: str) -> str | None:
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        if self.directory is None:
+            return None
+
+        try:
+            with open(self.path(key), encoding='UTF-8') as f:
+                body = f.read()
+        except OSError:
+            return None
+
+        self._remember(key, body)
+        return body
+
+    def put(self, key: str, body: str):
+        self._remember(key, body)
+
+        if self.directory is None:
+            return
+
+        path = self.path(key)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp, 'w', encoding='UTF-8') as f:
+                f.write(body)
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _remember(self, key: str, body: str):
+        self.entries[key] = body
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.cache_size:
+            self.entries.popitem(last=False)
+
+
+def _library_version() -> str:
+    try:
+        return importlib.metadata.version('sekaiworld.scores')
+    except importlib.metadata.PackageNotFoundError:
+        return 'dev'
+
+
+def _string_index(strings: list[str], s: str | None) -> int:
+    if s is None:
+        return -1
+    strings.append(s)
+    return len(strings) - 1
+
+
+_note_kinds = (Tap, Directional, Slide)
+
+# what loading a corrupt or stale compiled score may raise, taken as a cache
+# miss, e.g. TypeError for meta fields this version does not know
+_load_errors = (OSError, ValueError, IndexError, KeyError, TypeError, ZeroDivisionError, struct.error)
+
+# magic, format version, key, listed notes, all notes, events, extra json length
+_header = struct.Struct('<4sH32sIIII')
+# bar, lane, width, type, speed, kind, channel, decoration, tap, directional, next, head
+_note_record = struct.Struct('<qqhhhdBBBxiiii')
+# bar, bpm, bar length, sentence length, speed, flags, section, text
+_event_record = struct.Struct('<qqqqqqqdBxxxii')
@@ -1,5 +1,10 @@
 import os
 import math
+import bisect
+import itertools
+import functools
+import concurrent.futures
+import xml.etree.ElementTree
 
 import svgwrite
 import svgwrite.base
@@ -16,6 +21,8 @@ from .notes import *
 
 from .score import *
 from .lyric import *
+from .cache import *
+from . import markup
 
 from dataclasses import dataclass
 from typing import Optional
@@ -37,6 +44,10 @@ class Drawing:
         style_sheet: str = '',
         note_host: str = 'https://asset3.pjsekai.moe/live/note/custom01',
         skill: bool = False,
+        ticks: bool = False,
+        precision: str = 'exact',
+        backend: str = 'svgwrite',
+        cache: SentenceCache | None = None,
         **kwargs,
     ):
 
@@ -72,177 +83,250 @@ class Drawing:
         '''skill'''
         self.skill = skill
         self.special_covers: list[CoverRect] = []
-
-        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'css/default.css'), encoding='UTF-8') as f:
-            self.style_sheet = f.read() 
+        # rebuilt from the score by every render, after `special_covers`
+        self.skill_covers: list[CoverRect] = []
+
+        '''timing'''
+        # layout through the score's integer tick timeline instead of fractions
+        self.ticks = ticks
+        # 'exact', or 'draft' for float64 layout, at most 1px off after rounding
+        if precision not in ('exact', 'draft'):
+            raise ValueError(f'unknown precision: {precision!r}')
+        self.precision = precision
+
+        '''output'''
+        # 'svgwrite', or 'markup' to format the same svg straight into strings
+        if backend not in ('svgwrite', 'markup'):
+            raise ValueError(f'unknown backend: {backend!r}')
+        self.backend = backend
+        # drawn sentences to reuse, for the markup backend and `write`
+        self.cache = cache
+
+        '''timeline'''
+        # sorted once, every sentence bisects the words it shows
+        self.lyric_words: list[Word] = sorted(lyric.words, key=lambda word: word.bar) if lyric else []
+
+        self.style_sheet = _read_style_sheet('default.css')
 
         if self.skill:
-            with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'css/skill.css'), encoding='UTF-8') as f:
-                self.style_sheet += '\n' + f.read() 
+            self.style_sheet += '\n' + _read_style_sheet('skill.css')
 
         self.style_sheet += '\n' + style_sheet
 
-    def __getitem__(self, bar: slice) -> svgwrite.Drawing:
+    @property
+    def svg_elements(self):
+        return markup if self.backend == 'markup' else _SvgwriteElements
+
+    def __getitem__(self, bar: slice) -> 'svgwrite.Drawing | markup.Drawing':
         bar = slice(bar.start or 0, bar.stop or int(self.score.notes[-1].bar + 1))
         sentence = DrawingSentence(self, bar)
         return sentence.svg()
 
-    def svg(self) -> svgwrite.Drawing:
-        n_bars = math.ceil(self.score.notes[-1].bar)
+    def svg(self, workers: int = 0) -> 'svgwrite.Drawing | markup.Drawing':
+        '''
+        The whole chart. With `workers`, sentences are drawn in that many
+        processes, to the same output.
+        '''
+        self.build_skill_covers()
+
+        if workers or self.cache is not None and self.backend == 'markup':
+            return self.svg_placed(workers)
+
+        drawings = [self[bar] for bar in self.sentence_bars()]
+
+        width = sum(d['width'] for d in drawings)
+        height = max((d['height'] for d in drawings), default=0)
 
-        drawings: list[svgwrite.Drawing] = []
+        drawing = self.frame(width, height, self.svg_elements)
 
         width = 0
-        height = 0
+        for d in drawings:
+            d['x'] = width + self.lane_padding
+            d['y'] = height - d['height'] + self.time_padding
+            width += d['width']
+            drawing.add(d)
 
-        bar = 0
-        event = Event(bar=0, bpm=120, bar_length=4, sentence_length=4)
+        return drawing
 
-        # skill cover
-        if self.skill:
-            skill_i = 0
-            for e in self.score.events:
-                if e.text != "SKILL":
-                    continue
-                # print(e)
-                self.special_covers.append(CoverRect(
-                    self.score.get_bar_by_time(self.score.get_time(e.bar) - 5 / 60),
-                    "skill-great",
-                    self.score.get_bar_by_time(self.score.get_time(e.bar) + 5 + 5 / 60)
-                ))
-                self.special_covers.append(CoverRect(
-                    self.score.get_bar_by_time(self.score.get_time(e.bar) - 2.5 / 60),
-                    "skill-perfect",
-                    self.score.get_bar_by_time(self.score.get_time(e.bar) + 5 + 2.5 / 60)
-                ))
-                self.special_covers.append(CoverRect(
-                    e.bar,
-                    "skill-duration",
-                    self.score.get_bar_by_time(self.score.get_time(e.bar) + 5)
-                ))
-                skill_i += 1
+    def svg_placed(self, workers: int = 0) -> 'svgwrite.Drawing | markup.Drawing':
+        width, height, placements = self.place_sentences()
 
-        for i in range(n_bars + 1):
-            e = self.score.get_event(i)
+        drawing = self.frame(width, height, self.svg_elements)
 
-            if bar != i and (
-                e.section != event.section or
-                e.sentence_length != event.sentence_length or
-                i == bar + event.sentence_length or
-                i == n_bars
-            ):
-                d = self[bar: i]
+        for fragment in self.render_sentences(placements, workers, self.backend == 'markup'):
+            drawing.add(fragment if isinstance(fragment, str) else _Prebuilt(fragment))
 
-                width += d['width']
-                if height < d['height']:
-                    height = d['height']
+        return drawing
 
-                drawings.append(d)
+    def write(self, f, workers: int = 0):
+        '''
+        Write the svg of `svg` to the text file `f`, one sentence at a time.
 
-                bar = i
+        Sentence sizes are known before any of them is drawn, so the frame and
+        defs go out first and each sentence is drawn, written and dropped in
+        turn; only one sentence is held in memory at a time, or one per
+        worker with `workers`.
+        '''
+        self.build_skill_covers()
 
-            event |= e
+        width, height, placements = self.place_sentences()
 
-        drawing = svgwrite.Drawing(size=(
-            width + self.lane_padding * 2,
-            height + self.time_padding * 2 + self.meta_size + self.time_padding * 2,
-        ))
+        *head, tail = self.frame(width, height, markup).fragments()
 
-        drawing.defs.add(drawing.style(self.style_sheet))
+        f.write('<?xml version="1.0" encoding="utf-8" ?>\n')
+        for fragment in head:
+            f.write(fragment)
 
-        decoration_gradient = svgwrite.gradients.LinearGradient(
-            start=(0, 1), end=(0, 0), id='decoration-gradient', debug=False)
-        decoration_gradient.add_stop_color(offset=0, color='var(--color-start)')
-        decoration_gradient.add_stop_color(offset=1, color='var(--color-stop)')
-        drawing.defs.add(decoration_gradient)
+        for fragment in self.render_sentences(placements, workers, True):
+            f.write(fragment)
 
-        decoration_critical_gradient = svgwrite.gradients.LinearGradient(
-            start=(0, 1), end=(0, 0), id='decoration-critical-gradient', debug=False)
-        decoration_critical_gradient.add_stop_color(offset=0, color='var(--color-start)')
-        decoration_critical_gradient.add_stop_color(offset=1, color='var(--color-stop)')
-        drawing.defs.add(decoration_critical_gradient)
+        f.write(tail)
 
-        # tap_left = svgwrite.masking.ClipPath(id="tap-left")
-        # tap_left.add(svgwrite.shapes.Rect(size=(100, 100)))
-        # drawing.defs.add(tap_left)
+    def saveas(self, filename: str, workers: int = 0):
+        with open(filename, 'w', encoding='utf-8') as f:
+            self.write(f, workers)
 
-        note_m_ratio = 1200
-        for note_number in range(0, 7):
-            symbol = svgwrite.container.Symbol(
-                id=f'notes-{note_number}',
-                viewBox='0 0 112 56',
-            )
-            symbol.add(svgwrite.image.Image(
-                href=f'{self.note_host}/notes_{note_number}.png',
-                insert=(-3, -3),
-                size=(118, 62),
-            ))
-            drawing.defs.add(symbol)
+    def place_sentences(self) -> tuple[int, int, list[tuple[slice, int, int]]]:
+        '''
+        The total width and height of the sentences, and the bars and
+        position of each, from their sizes alone.
+        '''
+        bars = self.sentence_bars()
+        sizes = [DrawingSentence(self, bar).size() for bar in bars]
 
-            symbol = svgwrite.container.Symbol(
-                id=f'notes-{note_number}-middle',
-                viewBox=f'0 0 {112 * note_m_ratio} {56}',
+        width = sum(w for w, _ in sizes)
+        height = max((h for _, h in sizes), default=0)
+
+        placements = []
+        x = 0
+        for bar, (w, h) in zip(bars, sizes):
+            placements.append((bar, x + self.lane_padding, height - h + self.time_padding))
+            x += w
+
+        return width, height, placements
+
+    def render_sentences(self, placements: list[tuple[slice, int, int]], workers: int = 0, as_markup: bool = True):
+        '''
+        Each placed sentence in order, as markup, or as xml if not
+        `as_markup`. Markup is reused from `cache` where it has it.
+        '''
+        if as_markup and self.cache is not None:
+            yield from self.render_cached_sentences(placements, workers)
+            return
+
+        yield from self.map_sentences(functools.partial(_render_sentence, as_markup=as_markup), placements, workers)
+
+    def render_cached_sentences(self, placements: list[tuple[slice, int, int]], workers: int = 0):
+        sentences = [DrawingSentence(self, bar) for bar, _, _ in placements]
+        keys = [self.cache.key(sentence.content()) for sentence in sentences]
+        bodies = [self.cache.get(key) for key in keys]
+
+        drawn = self.map_sentences(_render_body, [
+            sentence.bar
+            for sentence, body in zip(sentences, bodies)
+            if body is None
+        ], workers)
+
+        for (_, x, y), sentence, key, body in zip(placements, sentences, keys, bodies):
+            if body is None:
+                body = next(drawn)
+                self.cache.put(key, body)
+
+            yield markup.tostring(markup.Drawing.from_body(body, size=sentence.size(), x=x, y=y))
+
+    def map_sentences(self, function, items: list, workers: int = 0):
+        '''
+        `function(self, item)` of each item in order. With `workers`, the
+        drawing is shipped to that many processes once and called there.
+        '''
+        if not workers or not items:
+            for item in items:
+                yield function(self, item)
+            return
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self,),
+        ) as executor:
+            yield from executor.map(
+                _call_worker,
+                itertools.repeat(function),
+                items,
+                chunksize=max(len(items) // (workers * 4), 1),
             )
-            symbol.add(svgwrite.image.Image(
-                href=f'{self.note_host}/notes_{note_number}.png',
-                insert=(-(3 + 28) * note_m_ratio, -3), size=(118 * note_m_ratio, 62),
-                preserveAspectRatio='none',
+
+    def build_skill_covers(self):
+        self.skill_covers = []
+        if not self.skill:
+            return
+
+        skill_i = 0
+        for e in self.score.events:
+            if e.text != "SKILL":
+                continue
+            # print(e)
+            self.skill_covers.append(CoverRect(
+                self.score.get_bar_by_time(self.score.get_time(e.bar) - 5 / 60),
+                "skill-great",
+                self.score.get_bar_by_time(self.score.get_time(e.bar) + 5 + 5 / 60)
+            ))
+            self.skill_covers.append(CoverRect(
+                self.score.get_bar_by_time(self.score.get_time(e.bar) - 2.5 / 60),
+                "skill-perfect",
+                self.score.get_bar_by_time(self.score.get_time(e.bar) + 5 + 2.5 / 60)
+            ))
+            self.skill_covers.append(CoverRect(
+                e.bar,
+                "skill-duration",
+                self.score.get_bar_by_time(self.score.get_time(e.bar) + 5)
             ))
-            drawing.defs.add(symbol)
+            skill_i += 1
 
-            for i in range(1, self.n_lanes + 1):
-                note_height = self.note_size
-                note_width = self.lane_width * (i + 1)
-                note_inner_width = self.lane_width * i
+    def sentence_bars(self) -> list[slice]:
+        '''
+        The bars of each sentence: a new one starts with each section, each
+        sentence length change and every sentence length bars.
+        '''
+        n_bars = math.ceil(self.score.notes[-1].bar)
 
-                note_l_width = note_r_width = note_height / 56 * 32
-                note_m_width = note_inner_width - (note_l_width + note_r_width) / 2 - 2
-                note_padding_x = (note_width - note_l_width - note_m_width - note_r_width) / 2
+        bars: list[slice] = []
 
-                symbol = svgwrite.container.Symbol(
-                    id=f'notes-{note_number}-{i}', viewBox=f'0 0 {note_width} {note_height}')
+        bar = 0
+        event = Event(bar=0, bpm=120, bar_length=4, sentence_length=4)
 
-                left_clip_path = svgwrite.masking.ClipPath(id=f'notes-{note_number}-{i}-left')
-                left_clip_path.add(svgwrite.shapes.Rect(
-                    insert=(0, 0),
-                    size=(note_l_width, note_height),
-                ))
-                symbol.add(left_clip_path)
+        for i in range(n_bars + 1):
+            e = self.score.get_event(i)
 
-                middle_clip_path = svgwrite.masking.ClipPath(id=f'notes-{note_number}-{i}-middle')
-                middle_clip_path.add(svgwrite.shapes.Rect(
-                    insert=(0, 0),
-                    size=(note_m_width, note_height),
-                ))
-                symbol.add(middle_clip_path)
+            if bar != i and (
+                e.section != event.section or
+                e.sentence_length != event.sentence_length or
+                i == bar + event.sentence_length or
+                i == n_bars
+            ):
+                bars.append(slice(bar, i))
+                bar = i
 
-                right_clip_path = svgwrite.masking.ClipPath(id=f'notes-{note_number}-{i}-right')
-                right_clip_path.add(svgwrite.shapes.Rect(
-                    insert=(note_height / 56 * 80, 0),
-                    size=(note_r_width, note_height),
-                ))
-                symbol.add(right_clip_path)
+            event |= e
 
-                symbol.add(svgwrite.container.Use(
-                    href=f'#notes-{note_number}',
-                    insert=(note_padding_x, 0),
-                    size=(note_height * 2, note_height),
-                    clip_path=f'url(#notes-{note_number}-{i}-left)',
-                ))
-                symbol.add(svgwrite.container.Use(
-                    href=f'#notes-{note_number}-middle',
-                    insert=(note_padding_x + note_l_width, 0),
-                    size=(note_height * note_m_ratio * 2, note_height),
-                    clip_path=f'url(#notes-{note_number}-{i}-middle)',
-                ))
-                symbol.add(svgwrite.container.Use(
-                    href=f'#notes-{note_number}',
-                    insert=(note_padding_x + note_l_width + note_m_width + note_r_width - note_height * 2, 0),
-                    size=(note_height * 2, note_height),
-                    clip_path=f'url(#notes-{note_number}-{i}-right)',
-                ))
+        return bars
 
-                drawing.defs.add(symbol)
+    def frame(self, width, height, elements=None):
+        '''
+        The drawing around `width` by `height` of sentences: style sheet,
+        defs, background and meta, built with the `elements` of a backend.
+        '''
+        elements = elements or self.svg_elements
+
+        drawing = elements.Drawing(size=(
+            width + self.lane_padding * 2,
+            height + self.time_padding * 2 + self.meta_size + self.time_padding * 2,
+        ))
+
+        drawing.defs.add(drawing.style(self.style_sheet))
+
+        for element in _note_defs(self.note_host, self.n_lanes, self.lane_width, self.note_size):
+            drawing.defs.add(element)
 
         drawing.add(drawing.rect(
             insert=(0, 0),
@@ -274,7 +358,7 @@ class Drawing:
             class_='meta-line',
         ))
 
-        drawing.add(svgwrite.image.Image(
+        drawing.add(elements.Image(
             href=self.score.meta.jacket or 'https://storage.sekai.best/sekai-jp-assets/thumbnail/chara_rip/res009_no021_normal.png',
             insert=(
                 self.lane_padding * 2,
@@ -283,7 +367,7 @@ class Drawing:
             size=(self.meta_size, self.meta_size),
         ))
 
-        drawing.add(svgwrite.text.Text(
+        drawing.add(elements.Text(
             ' - '.join(filter(lambda x: x, [
                 self.score.meta.title,
                 self.score.meta.artist,
@@ -295,7 +379,7 @@ class Drawing:
             class_='title',
         ))
 
-        drawing.add(svgwrite.text.Text(
+        drawing.add(elements.Text(
             ' '.join(filter(lambda x: x, [
                 self.score.meta.difficulty and str(self.score.meta.difficulty).upper(),
                 self.score.meta.playlevel,
@@ -314,7 +398,7 @@ class Drawing:
         # drawing.add(scale)
         
         
-        drawing.add(svgwrite.text.Text(
+        drawing.add(elements.Text(
             'Code by ぷろせかもえ！ (pjsekai.moe)　& Unibot & 33 (3-3.dev & bilibili @xfl03)',
             insert=(
                 width - 900,
@@ -323,13 +407,6 @@ class Drawing:
             class_='themehint',
         ))
 
-        width = 0
-        for d in drawings:
-            d['x'] = width + self.lane_padding
-            d['y'] = height - d['height'] + self.time_padding
-            width += d['width']
-            drawing.add(d)
-
         return drawing
 
 
@@ -347,13 +424,67 @@ class DrawingSentence(Drawing):
         for k, v in vars(drawing).items():
             self.__setattr__(k, v)
 
+    def get_time_delta(self, bar_from: Fraction, bar_to: Fraction) -> Fraction:
+        if self.precision == 'draft':
+            return self.score.get_time_float(bar_to) - self.score.get_time_float(bar_from)
+
+        if self.ticks:
+            timeline = self.score.tick_timeline
+            tick_from, tick_to = timeline.tick(bar_from), timeline.tick(bar_to)
+            if tick_from is not None and tick_to is not None:
+                return timeline.get_time_delta(tick_from, tick_to)
+
+        return self.score.get_time_delta(bar_from, bar_to)
+
+    def get_y(self, bar: Fraction) -> Fraction:
+        '''
+        The y of `bar` in this sentence, in px from the top.
+        '''
+        if self.ticks and self.precision != 'draft':
+            # all on the integer grid: time units scaled to px, one fraction
+            timeline = self.score.tick_timeline
+            tick, tick_stop = timeline.tick(bar), timeline.tick(self.bar.stop)
+            if tick is not None and tick_stop is not None:
+                units = timeline.get_time_units(tick_stop) - timeline.get_time_units(tick)
+                return Fraction(
+                    self.time_height * units + self.time_padding * timeline.time_denominator,
+                    timeline.time_denominator,
+                )
+
+        return self.time_height * self.get_time_delta(bar, self.bar.stop) + self.time_padding
+
+    def visible_events(self) -> list[Event]:
+        '''
+        The score events from a bar before this sentence to a bar after it,
+        widened to whole runs of events 1/16 bar apart, which print merged.
+        '''
+        events = self.score.events
+        bar_from, bar_to = self.bar.start - 1, self.bar.stop + 1
+
+        i = bisect.bisect_left(events, (float(bar_from), bar_from), key=BaseNote.sort_key)
+        j = bisect.bisect_right(events, (float(bar_to), bar_to), key=BaseNote.sort_key)
+
+        while 0 < i < len(events) and events[i].bar - events[i - 1].bar <= 1 / 16:
+            i -= 1
+        while 0 < j < len(events) and events[j].bar - events[j - 1].bar <= 1 / 16:
+            j += 1
+
+        return events[i:j]
+
+    def visible_words(self) -> list[Word]:
+        bar_from, bar_to = self.bar.start - 1, self.bar.stop + 1
+        return self.lyric_words[
+            bisect.bisect_left(self.lyric_words, bar_from, key=lambda word: word.bar):
+            bisect.bisect_left(self.lyric_words, bar_to, key=lambda word: word.bar)
+        ]
+
     def _get_bezier_coordinates(self, slide_0: Slide, slide_1: Slide):
         # Bézier curve:
         # left: from l[0], controlled by l[1] and l[2], to l[3]
         # right: from r[0], controlled by r[1] and r[2], to r[3]
 
-        y_0 = self.time_height * self.score.get_time_delta(slide_0.bar, self.bar.stop) + self.time_padding
-        y_1 = self.time_height * self.score.get_time_delta(slide_1.bar, self.bar.stop) + self.time_padding
+        y_0 = self.get_y(slide_0.bar)
+        y_1 = self.get_y(slide_1.bar)
 
         ease_in = slide_0.directional and slide_0.directional.type in (
             DirectionalType.DOWN, )
@@ -409,7 +540,7 @@ class DrawingSentence(Drawing):
                 if slide_1.type == SlideType.RELAY:
                     amongs.append(slide_1)
 
-                if slide_1.is_path():
+                if slide_1.flags & NoteFlags.PATH:
                     break
 
                 slide_1 = slide_1.next
@@ -443,28 +574,28 @@ class DrawingSentence(Drawing):
 
         class_name: str
         if slide.decoration:
-            class_name = 'decoration-critical' if slide.is_critical() else 'decoration'
+            class_name = 'decoration-critical' if slide.flags & NoteFlags.CRITICAL else 'decoration'
         else:
-            class_name = 'slide-critical' if slide.is_critical() else 'slide'
+            class_name = 'slide-critical' if slide.flags & NoteFlags.CRITICAL else 'slide'
 
         self.slide_paths.append(
-            svgwrite.path.Path(
+            self.svg_elements.Path(
                 d=d,
                 class_=class_name,
             ),
         )
 
     def add_friction_among_image(self, note: Note):
-        y = self.time_height * self.score.get_time_delta(note.bar, self.bar.stop) + self.time_padding
+        y = self.get_y(note.bar)
         x = self.lane_width * (note.lane + note.width / 2 - 2) + self.lane_padding
 
         w = self.lane_width * 0.75
         h = self.lane_width * 0.75
 
-        self.among_images.append(svgwrite.image.Image(
+        self.among_images.append(self.svg_elements.Image(
             href='%s/notes_friction_among%s.png' % (
                 self.note_host,
-                '_crtcl' if note.is_critical() else '_flick' if isinstance(note, Directional) else '_long',
+                '_crtcl' if note.flags & NoteFlags.CRITICAL else '_flick' if isinstance(note, Directional) else '_long',
             ),
             insert=(
                 round(x - w / 2),
@@ -477,7 +608,7 @@ class DrawingSentence(Drawing):
         ))
 
     def add_among_image(self, note: Note, l, r):
-        y = self.time_height * self.score.get_time_delta(note.bar, self.bar.stop) + self.time_padding
+        y = self.get_y(note.bar)
 
         x_l = _binary_solution_for_x(y, l)
         x_r = _binary_solution_for_x(y, r)
@@ -486,10 +617,10 @@ class DrawingSentence(Drawing):
         w = self.lane_width
         h = self.lane_width
 
-        self.among_images.append(svgwrite.image.Image(
+        self.among_images.append(self.svg_elements.Image(
             href='%s/notes_long_among%s.png' % (
                 self.note_host,
-                '_crtcl' if note.is_critical() else '',
+                '_crtcl' if note.flags & NoteFlags.CRITICAL else '',
             ),
             insert=(
                 round(x - w / 2),
@@ -502,36 +633,20 @@ class DrawingSentence(Drawing):
         ))
 
     def add_note_images(self, note: Note):
-        y = self.time_height * self.score.get_time_delta(note.bar, self.bar.stop) + self.time_padding
+        y = self.get_y(note.bar)
         x = self.lane_width * (note.lane - 2.5) + self.lane_padding
 
         w = self.lane_width * (note.width + 1)
         h = self.lane_width / 64 * 56 * 2
 
-        note_number = 2
+        note_number = note.flags.sprite
 
-        if note.is_none():
+        if note_number is None:
             return
-        elif note.is_trend():
+        elif note.flags & NoteFlags.TREND:
             self.add_friction_among_image(note)
-            if note.is_critical():
-                note_number = 5
-            elif isinstance(note, Directional):
-                note_number = 6
-            else:
-                note_number = 4
-        else:
-            if note.is_critical():
-                note_number = 0
-            elif isinstance(note, Directional):
-                note_number = 3
-            elif isinstance(note, Slide):
-                if note.type == SlideType.END and note.directional:
-                    note_number = 3
-                else:
-                    note_number = 1
-
-        self.note_images.append(svgwrite.container.Use(
+
+        self.note_images.append(self.svg_elements.Use(
             href=f'#notes-{note_number}-{note.width}',
             insert=(round(x), round(y - h / 2)),
             size=(round(w), round(h)),
@@ -539,9 +654,9 @@ class DrawingSentence(Drawing):
 
     def add_flick_image(self, note: Note):
         src = '%s/notes_flick_arrow%s_0%s%s.png'
-        y = self.time_height * self.score.get_time_delta(note.bar, self.bar.stop) + self.time_padding
+        y = self.get_y(note.bar)
 
-        if note.is_none():
+        if note.flags & NoteFlags.NONE:
             return
 
         type = DirectionalType.UP
@@ -575,10 +690,10 @@ class DrawingSentence(Drawing):
             0
         )
 
-        self.flick_images.append(svgwrite.image.Image(
+        self.flick_images.append(self.svg_elements.Image(
             src % (
                 self.note_host,
-                '_crtcl' if note.is_critical() else '',
+                '_crtcl' if note.flags & NoteFlags.CRITICAL else '',
                 width,
                 '_diagonal' if type in (DirectionalType.UPPER_LEFT, DirectionalType.UPPER_RIGHT) else ''
             ),
@@ -596,10 +711,15 @@ class DrawingSentence(Drawing):
         ))
 
     def add_tick_text(self, note: Note, next: Note | None = None):
-        y = self.time_height * self.score.get_time_delta(note.bar, self.bar.stop) + self.time_padding
+        text = self.score.get_tick_label(note, next)
+        if text is not None:
+            self.add_tick_label(note, text)
+
+    def add_tick_label(self, note: Note, text: str):
+        y = self.get_y(note.bar)
 
-        if next is None:
-            self.tick_texts.append(svgwrite.shapes.Line(
+        if not text:
+            self.tick_texts.append(self.svg_elements.Line(
                 start=(
                     round(self.lane_padding - self.tick_2_length),
                     round(y),
@@ -612,27 +732,7 @@ class DrawingSentence(Drawing):
             ))
             return
 
-        if (
-            next is None or
-            next is note or
-            next.bar == note.bar or
-            next.bar - note.bar > 1 or
-            next.bar - note.bar > 0.5 and int(next.bar) != int(note.bar)
-        ):
-            interval = math.floor(note.bar + 1) - note.bar
-        else:
-            interval = next.bar - note.bar
-
-        interval = interval * self.score.get_event(note.bar).bar_length / 4
-        interval = interval.limit_denominator(100)
-
-        if interval == 0:
-            return
-
-        text = '%g/%g' % (interval.numerator, interval.denominator) if interval.numerator != 1 else \
-            '/%g' % (interval.denominator,)
-
-        self.tick_texts.append(svgwrite.shapes.Line(
+        self.tick_texts.append(self.svg_elements.Line(
             start=(
                 round(self.lane_padding - self.tick_length),
                 round(y),
@@ -643,7 +743,7 @@ class DrawingSentence(Drawing):
             ),
             class_='tick-line',
         ))
-        self.tick_texts.append(svgwrite.text.Text(
+        self.tick_texts.append(self.svg_elements.Text(
             text,
             insert=(
                 round(self.lane_padding - 4),
@@ -652,42 +752,98 @@ class DrawingSentence(Drawing):
             class_='tick-text',
         ))
 
-    def svg(self):
-        for i, note in enumerate(self.score.notes):
+    def content(self) -> tuple:
+        '''
+        Everything this sentence is drawn from, for `SentenceCache` to key
+        it by: the parameters, and the notes, events, words and covers in
+        reach, with the tempo over all the bars they span.
+        '''
+        bar_from, bar_to = self.bar.start - 1, self.bar.stop + 1
+        bars = [bar_from, bar_to]
+
+        notes = []
+        for i in self.score.bar_index.query(bar_from, bar_to):
+            note = self.score.notes[i]
             if isinstance(note, Slide):
-                slide: Slide = note.head
-                before = None
-                while slide:
-                    while not slide.is_path():
-                        slide = slide.next
-
-                    if self.bar.start - 1 <= slide.bar < self.bar.stop + 1:  # in
-                        break
-                    elif slide.bar < self.bar.start - 1:  # before
-                        before = True
-                    elif before and self.bar.stop + 1 < slide.bar:  # after
-                        break
+                if not self.score.slide_chains[i].touches(bar_from, bar_to):
+                    continue
+
+            else:
+                if not bar_from <= note.bar < bar_to:
+                    continue
 
+            # the notes drawn along with this one: its tap and flick, and
+            # every note of the path a slide start draws
+            drawn = [note, getattr(note, 'tap', None), getattr(note, 'directional', None)]
+            if isinstance(note, Slide) and note.type == SlideType.START:
+                slide = note.next
+                while slide is not None:
+                    drawn.append(slide)
                     slide = slide.next
-                else:
+
+            notes.append((self.score.tick_labels[i], *(
+                (drawn_note, drawn_note.flags) if drawn_note is not None else None
+                for drawn_note in drawn
+            )))
+            bars += [drawn_note.bar for drawn_note in drawn if drawn_note is not None]
+
+        events = self.visible_events()
+        bars += [event.bar for event in events]
+
+        words = self.visible_words() if self.lyric else []
+        bars += [word.bar for word in words]
+
+        covers = []
+        for cover in self.special_covers + self.skill_covers:
+            cover_bar_from = max(self.bar.start - 0.2, cover.bar_from)
+            cover_bar_to = min(self.bar.stop + 0.2, cover.bar_to)
+            if cover_bar_from < cover_bar_to:
+                covers.append(cover)
+                bars += [cover_bar_from, cover_bar_to]
+
+        tempo_map = self.score.tempo_map
+        i = bisect.bisect(tempo_map.bars, min(bars)) - 1
+        j = bisect.bisect(tempo_map.bars, max(bars))
+        # bars before the first segment fall back to the last one
+        segments = list(range(max(i, 0), j)) + ([len(tempo_map) - 1] if i < 0 else [])
+        tempo = [(
+            tempo_map.bars[k],
+            tempo_map.seconds_per_bar[k],
+            tempo_map.events[k].bar_length,
+            tempo_map.float_times[k] if self.precision == 'draft' else None,
+        ) for k in segments]
+
+        return (
+            (self.bar.start, self.bar.stop),
+            (
+                self.n_lanes, self.lane_width, self.time_height, self.note_size, self.flick_height,
+                self.lane_padding, self.time_padding, self.slide_path_padding,
+                self.tick_length, self.tick_2_length,
+                self.note_host, self.precision, self.ticks,
+            ),
+            notes, events, words, covers, tempo,
+        )
+
+    def size(self) -> tuple[int, int]:
+        height = self.time_height * self.get_time_delta(self.bar.start, self.bar.stop)
+        return (
+            round(self.lane_width * self.n_lanes + self.lane_padding * 2),
+            round(height + self.time_padding * 2),
+        )
+
+    def svg(self):
+        for i in self.score.bar_index.query(self.bar.start - 1, self.bar.stop + 1):
+            note = self.score.notes[i]
+            if isinstance(note, Slide):
+                if not self.score.slide_chains[i].touches(self.bar.start - 1, self.bar.stop + 1):
                     continue
 
             else:
                 if not self.bar.start - 1 <= note.bar < self.bar.stop + 1:
                     continue
 
-            if note.is_tick() is not None:
-                next_tick: Note
-                if note.is_tick():
-                    for next_tick in self.score.notes[i:]:
-                        if next_tick.is_tick() and next_tick.bar > note.bar:
-                            break
-                    else:
-                        next_tick = note
-                else:
-                    next_tick = None
-
-                self.add_tick_text(note, next=next_tick)
+            if (text := self.score.tick_labels[i]) is not None:
+                self.add_tick_label(note, text)
 
             if isinstance(note, Tap):
                 self.add_note_images(note)
@@ -730,14 +886,9 @@ class DrawingSentence(Drawing):
                     if note.directional:
                         self.add_flick_image(note)
 
-        height = self.time_height * self.score.get_time_delta(self.bar.start, self.bar.stop)
+        height = self.time_height * self.get_time_delta(self.bar.start, self.bar.stop)
 
-        drawing = svgwrite.Drawing(
-            size=(
-                round(self.lane_width * self.n_lanes + self.lane_padding * 2),
-                round(height + self.time_padding * 2),
-            ),
-        )
+        drawing = self.svg_elements.Drawing(size=self.size())
 
         drawing.add(drawing.rect(
             insert=(0, 0),
@@ -758,7 +909,7 @@ class DrawingSentence(Drawing):
         ))
 
         # Draw special cover under notes
-        for cover in self.special_covers:
+        for cover in self.special_covers + self.skill_covers:
             cover_bar_from = max(self.bar.start - 0.2, cover.bar_from)
             cover_bar_to  = min(self.bar.stop + 0.2, cover.bar_to)
             if cover_bar_to <= cover_bar_from:
@@ -766,11 +917,11 @@ class DrawingSentence(Drawing):
             drawing.add(drawing.rect(
                 insert=(
                     self.lane_padding,
-                    round(self.time_height * self.score.get_time_delta(cover_bar_to, self.bar.stop) + self.time_padding),
+                    round(self.get_y(cover_bar_to)),
                 ),
                 size=(
                     round(self.lane_width * self.n_lanes),
-                    round(self.time_height * self.score.get_time_delta(cover_bar_from, cover_bar_to))
+                    round(self.time_height * self.get_time_delta(cover_bar_from, cover_bar_to))
                 ),
                 class_=cover.css_class
             ))
@@ -793,19 +944,18 @@ class DrawingSentence(Drawing):
             drawing.add(drawing.line(
                 start=(
                     round(self.lane_width * 0 + self.lane_padding),
-                    round(self.time_height * self.score.get_time_delta(bar, self.bar.stop) + self.time_padding),
+                    round(self.get_y(bar)),
                 ),
                 end=(
                     round(self.lane_width * self.n_lanes + self.lane_padding),
-                    round(self.time_height * self.score.get_time_delta(bar, self.bar.stop) + self.time_padding),
+                    round(self.get_y(bar)),
                 ),
                 class_='bar-line',
             ))
 
             event = self.score.get_event(bar)
             for i in range(1, math.ceil(event.bar_length)):
-                t = self.score.get_time_delta(bar + Fraction(i, event.bar_length), self.bar.stop)
-                y = self.time_height * t + self.time_padding
+                y = self.get_y(bar + Fraction(i, event.bar_length))
 
                 drawing.add(drawing.line(
                     start=(
@@ -820,16 +970,19 @@ class DrawingSentence(Drawing):
                 ))
 
         print_events: list[Event] = []
-        for event in sorted([Event(bar=i) for i in range(self.bar.start, self.bar.stop + 1)] + self.score.events):
+        for event in sorted(
+            [Event(bar=i) for i in range(self.bar.start, self.bar.stop + 1)] + self.visible_events(),
+            key=BaseNote.sort_key,
+        ):
             if event.speed:
                 drawing.add(drawing.line(
                     start=(
                         round(self.lane_width * 0 + self.lane_padding),
-                        round(self.time_height * self.score.get_time_delta(event.bar, self.bar.stop) + self.time_padding),
+                        round(self.get_y(event.bar)),
                     ),
                     end=(
                         round(self.lane_width * self.n_lanes + self.lane_padding),
-                        round(self.time_height * self.score.get_time_delta(event.bar, self.bar.stop) + self.time_padding),
+                        round(self.get_y(event.bar)),
                     ),
                     class_='speed-line',
                 ))
@@ -838,7 +991,7 @@ class DrawingSentence(Drawing):
                     '%gx' % event.speed,
                     insert=(
                         round(self.lane_width * self.n_lanes + self.lane_padding - 2),
-                        round(self.time_height * self.score.get_time_delta(event.bar, self.bar.stop) + self.time_padding - 2),
+                        round(self.get_y(event.bar) - 2),
                     ),
                     class_='speed-text',
                 ))
@@ -855,11 +1008,11 @@ class DrawingSentence(Drawing):
             drawing.add(drawing.line(
                 start=(
                     round(self.lane_width * 0),
-                    round(self.time_height * self.score.get_time_delta(event.bar, self.bar.stop) + self.time_padding),
+                    round(self.get_y(event.bar)),
                 ),
                 end=(
                     round(self.lane_width * 0 + self.lane_padding),
-                    round(self.time_height * self.score.get_time_delta(event.bar, self.bar.stop) + self.time_padding),
+                    round(self.get_y(event.bar)),
                 ),
                 class_='bar-count-flag' if not special else 'event-flag',
             ))
@@ -885,32 +1038,28 @@ class DrawingSentence(Drawing):
                 text,
                 insert=(
                     round(self.lane_padding + 8),
-                    round(self.time_height * self.score.get_time_delta(event.bar,
-                          self.bar.stop) + self.time_padding - self.lane_width * 1.5),
+                    round(self.get_y(event.bar) - self.lane_width * 1.5),
                 ),
                 transform=f'''rotate(-90, {
                     round(self.lane_padding)
                 }, {
-                    round(self.time_height * self.score.get_time_delta(event.bar, self.bar.stop) + self.time_padding)
+                    round(self.get_y(event.bar))
                 })''',
                 class_='bar-count-text' if not special else 'event-text',
             ))
 
         if self.lyric:
-            for word in self.lyric.words:
-                if not self.bar.start - 1 <= word.bar < self.bar.stop + 1:
-                    continue
-
+            for word in self.visible_words():
                 drawing.add(drawing.text(
                     word.text,
                     insert=(
                         round(self.lane_width * self.n_lanes + self.lane_padding),
-                        round(self.time_height * self.score.get_time_delta(word.bar, self.bar.stop) + self.time_padding + 16),
+                        round(self.get_y(word.bar) + 16),
                     ),
                     transform=f'''rotate(-90, {
                         round(self.lane_width * self.n_lanes + self.lane_padding)
                     }, {
-                        round(self.time_height * self.score.get_time_delta(word.bar, self.bar.stop) + self.time_padding)
+                        round(self.get_y(word.bar))
                     })''',
                     class_='lyric-text',
                 ))
@@ -933,6 +1082,172 @@ class DrawingSentence(Drawing):
         return drawing
 
 
+def _render_sentence(drawing: Drawing, placement: tuple[slice, int, int], as_markup: bool = True):
+    bar, x, y = placement
+
+    d = drawing[bar]
+    d['x'], d['y'] = x, y
+    return markup.tostring(d) if as_markup else d.get_xml()
+
+
+def _render_body(drawing: Drawing, bar: slice) -> str:
+    return markup.body(drawing[bar])
+
+
+# the drawing of a worker process, shipped once by `_init_worker`
+_worker_drawing: Drawing | None = None
+
+
+def _init_worker(drawing: Drawing):
+    global _worker_drawing
+    _worker_drawing = drawing
+
+
+def _call_worker(function, item):
+    return function(_worker_drawing, item)
+
+
+@functools.cache
+def _note_defs(note_host: str, n_lanes: int, lane_width: int, note_size: int) -> tuple['_Prebuilt', ...]:
+    '''
+    The gradients and note sprite symbols of every drawing, identical for the
+    same parameters, so each process builds them once and shares the xml.
+    '''
+    defs = []
+
+    decoration_gradient = svgwrite.gradients.LinearGradient(
+        start=(0, 1), end=(0, 0), id='decoration-gradient', debug=False)
+    decoration_gradient.add_stop_color(offset=0, color='var(--color-start)')
+    decoration_gradient.add_stop_color(offset=1, color='var(--color-stop)')
+    defs.append(decoration_gradient)
+
+    decoration_critical_gradient = svgwrite.gradients.LinearGradient(
+        start=(0, 1), end=(0, 0), id='decoration-critical-gradient', debug=False)
+    decoration_critical_gradient.add_stop_color(offset=0, color='var(--color-start)')
+    decoration_critical_gradient.add_stop_color(offset=1, color='var(--color-stop)')
+    defs.append(decoration_critical_gradient)
+
+    # tap_left = svgwrite.masking.ClipPath(id="tap-left")
+    # tap_left.add(svgwrite.shapes.Rect(size=(100, 100)))
+    # defs.append(tap_left)
+
+    note_m_ratio = 1200
+    for note_number in range(0, 7):
+        symbol = svgwrite.container.Symbol(
+            id=f'notes-{note_number}',
+            viewBox='0 0 112 56',
+        )
+        symbol.add(svgwrite.image.Image(
+            href=f'{note_host}/notes_{note_number}.png',
+            insert=(-3, -3),
+            size=(118, 62),
+        ))
+        defs.append(symbol)
+
+        symbol = svgwrite.container.Symbol(
+            id=f'notes-{note_number}-middle',
+            viewBox=f'0 0 {112 * note_m_ratio} {56}',
+        )
+        symbol.add(svgwrite.image.Image(
+            href=f'{note_host}/notes_{note_number}.png',
+            insert=(-(3 + 28) * note_m_ratio, -3), size=(118 * note_m_ratio, 62),
+            preserveAspectRatio='none',
+        ))
+        defs.append(symbol)
+
+        for i in range(1, n_lanes + 1):
+            note_height = note_size
+            note_width = lane_width * (i + 1)
+            note_inner_width = lane_width * i
+
+            note_l_width = note_r_width = note_height / 56 * 32
+            note_m_width = note_inner_width - (note_l_width + note_r_width) / 2 - 2
+            note_padding_x = (note_width - note_l_width - note_m_width - note_r_width) / 2
+
+            symbol = svgwrite.container.Symbol(
+                id=f'notes-{note_number}-{i}', viewBox=f'0 0 {note_width} {note_height}')
+
+            left_clip_path = svgwrite.masking.ClipPath(id=f'notes-{note_number}-{i}-left')
+            left_clip_path.add(svgwrite.shapes.Rect(
+                insert=(0, 0),
+                size=(note_l_width, note_height),
+            ))
+            symbol.add(left_clip_path)
+
+            middle_clip_path = svgwrite.masking.ClipPath(id=f'notes-{note_number}-{i}-middle')
+            middle_clip_path.add(svgwrite.shapes.Rect(
+                insert=(0, 0),
+                size=(note_m_width, note_height),
+            ))
+            symbol.add(middle_clip_path)
+
+            right_clip_path = svgwrite.masking.ClipPath(id=f'notes-{note_number}-{i}-right')
+            right_clip_path.add(svgwrite.shapes.Rect(
+                insert=(note_height / 56 * 80, 0),
+                size=(note_r_width, note_height),
+            ))
+            symbol.add(right_clip_path)
+
+            symbol.add(svgwrite.container.Use(
+                href=f'#notes-{note_number}',
+                insert=(note_padding_x, 0),
+                size=(note_height * 2, note_height),
+                clip_path=f'url(#notes-{note_number}-{i}-left)',
+            ))
+            symbol.add(svgwrite.container.Use(
+                href=f'#notes-{note_number}-middle',
+                insert=(note_padding_x + note_l_width, 0),
+                size=(note_height * note_m_ratio * 2, note_height),
+                clip_path=f'url(#notes-{note_number}-{i}-middle)',
+            ))
+            symbol.add(svgwrite.container.Use(
+                href=f'#notes-{note_number}',
+                insert=(note_padding_x + note_l_width + note_m_width + note_r_width - note_height * 2, 0),
+                size=(note_height * 2, note_height),
+                clip_path=f'url(#notes-{note_number}-{i}-right)',
+            ))
+
+            defs.append(symbol)
+
+    return tuple(_Prebuilt(element.get_xml()) for element in defs)
+
+
+class _SvgwriteElements:
+    '''
+    The svgwrite classes `Drawing` builds with, as `markup` names its own.
+    '''
+
+    Drawing = svgwrite.Drawing
+    Image = svgwrite.image.Image
+    Use = svgwrite.container.Use
+    Line = svgwrite.shapes.Line
+    Text = svgwrite.text.Text
+    Path = svgwrite.path.Path
+
+
+class _Prebuilt:
+    '''
+    An element whose xml is built already, added to drawings as it is.
+    '''
+
+    def __init__(self, xml):
+        self.xml = xml
+        self.elementname = xml.tag
+
+    def get_xml(self):
+        return self.xml
+
+    @functools.cached_property
+    def markup(self) -> str:
+        return xml.etree.ElementTree.tostring(self.xml, encoding='unicode')
+
+
+@functools.cache
+def _read_style_sheet(name: str) -> str:
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'css', name), encoding='UTF-8') as f:
+        return f.read()
+
+
 def _binary_solution_for_x(y, curve: list[tuple], s: slice = None, e=0.1):
     if s is None:
         s = slice(0, 1)
@@ -1,4 +1,5 @@
 import re
+import ast
 
 from .notes import *
 from .types import *
@@ -12,7 +13,7 @@ class BpmDefinition:
     bpm: Fraction
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class BpmReference(BaseNote):
     id: int
 
@@ -39,6 +40,30 @@ class TicksPerBeat(int):
     ...
 
 
+def decode_literal(data: str):
+    '''
+    Decode a header value written as a Python-style literal: a quoted string,
+    an integer or a float. Strings with backslash escapes and other literals
+    go through ast.literal_eval; anything else is returned as it is.
+    Unlike eval(), no code is ever executed.
+    '''
+    if match := _string_pattern.fullmatch(data):
+        if '\\' not in match.group(2):
+            return match.group(2)
+
+    try:
+        # int() refuses more digits than sys.get_int_max_str_digits()
+        if _int_pattern.fullmatch(data):
+            return int(data)
+
+        if _float_pattern.fullmatch(data):
+            return float(data)
+
+        return ast.literal_eval(data)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return data
+
+
 class Line:
     type: str
     header: str
@@ -46,18 +71,7 @@ class Line:
 
     def __init__(self, line: str):
         line = line.strip()
-
-        if match := re.match(r'^#(\w+)\s+(.*)$', line):
-            self.type = 'meta'
-            self.header, self.data = match.groups()
-
-        elif match := re.match(r'^#(\w+):\s*(.*)$', line):
-            self.type = 'score'
-            self.header, self.data = match.groups()
-
-        else:
-            self.type = 'comment'
-            self.header, self.data = 'comment', line
+        self.type, self.header, self.data = _tokenize(line)
 
     def parse(self):
         match self.type:
@@ -68,15 +82,11 @@ class Line:
     def parse_meta(self):
         meta = Meta()
         if hasattr(meta, self.header.lower()):
-            try:
-                data = eval(self.data)
-            except:
-                data = self.data
-            setattr(meta, self.header.lower(), data)
+            setattr(meta, self.header.lower(), decode_literal(self.data))
             yield meta
 
         elif self.header == 'REQUEST':
-            if match := re.match(r'^"ticks_per_beat\s+(\d+)"$', self.data):
+            if match := _ticks_per_beat_pattern.match(self.data):
                 yield TicksPerBeat(int(match.group(1)))
 
         elif self.header == 'HISPEED':
@@ -86,73 +96,105 @@ class Line:
             yield SpeedControl(None)
 
     def parse_score(self):
-        if match := re.match(r'^(\d\d\d)02$', self.header):
-            yield Event(bar=int(match.group(1)), bar_length=int(self.data))
-
-        elif match := re.match(r'^BPM(..)$', self.header):
-            yield BpmDefinition(id=int(match.group(1), 36), bpm=Fraction(self.data))
-
-        elif match := re.match(r'^(\d\d\d)08$', self.header):
-            for beat, data in self.parse_score_data():
-                yield BpmReference(bar=int(match.group(1)) + beat, id=int(data, 36))
-
-        elif match := re.match(r'^TIL(..)$', self.header):
-            id = int(match.group(1), 36)
-            data: str = eval(self.data)
-            items = []
-            if data:
-                for item in data.split(','):
-                    match = re.match(r'(\d+)\'(\d+):(\S+)', item.strip())
-                    item = SpeedDefinitionItem(
-                        bar=int(match.group(1)),
-                        tick=int(match.group(2)),
-                        speed=float(match.group(3)),
-                    )
-                    items.append(item)
-
-            yield SpeedDefinition(id=id, items=sorted(items, key=lambda item: (item.bar, item.tick)))
-
-        elif match := re.match(r'^(\d\d\d)1(.)$', self.header):
-            for beat, data in self.parse_score_data():
-                yield Tap(
-                    bar=int(match.group(1)) + beat,
-                    lane=int(match.group(2), 36),
-                    width=int(data[1], 36),
-                    type=int(data[0], 36),
+        header = self.header
+        if len(header) in (5, 6) and header[:3].isdecimal():
+            match len(header), header[3]:
+                case 5, '0':
+                    if header[4] == '2':
+                        yield from self.parse_bar_length(int(header[:3]))
+                    elif header[4] == '8':
+                        yield from self.parse_bpm_reference(int(header[:3]))
+                case 5, '1':
+                    yield from self.parse_notes(Tap, int(header[:3]), int(header[4], 36))
+                case 6, '3':
+                    yield from self.parse_notes(Slide, int(header[:3]), int(header[4], 36),
+                                                channel=int(header[5], 36), decoration=False)
+                case 5, '5':
+                    yield from self.parse_notes(Directional, int(header[:3]), int(header[4], 36))
+                case 6, '9':
+                    yield from self.parse_notes(Slide, int(header[:3]), int(header[4], 36),
+                                                channel=int(header[5], 36), decoration=True)
+
+        elif len(header) == 5 and header.startswith('BPM'):
+            yield BpmDefinition(id=int(header[3:], 36), bpm=Fraction(self.data))
+
+        elif len(header) == 5 and header.startswith('TIL'):
+            yield from self.parse_speed_definition(int(header[3:], 36))
+
+    def parse_bar_length(self, bar: int):
+        yield Event(bar=bar, bar_length=int(self.data))
+
+    def parse_bpm_reference(self, bar: int):
+        for beat, data in self.parse_score_data():
+            yield BpmReference(bar=bar + beat, id=int(data, 36))
+
+    def parse_speed_definition(self, id: int):
+        data: str = decode_literal(self.data)
+        items = []
+        if data:
+            for item in data.split(','):
+                match = _speed_item_pattern.match(item.strip())
+                item = SpeedDefinitionItem(
+                    bar=int(match.group(1)),
+                    tick=int(match.group(2)),
+                    speed=float(match.group(3)),
                 )
+                items.append(item)
 
-        elif match := re.match(r'^(\d\d\d)3(.)(.)$', self.header):
-            for beat, data in self.parse_score_data():
-                yield Slide(
-                    bar=int(match.group(1)) + beat,
-                    lane=int(match.group(2), 36),
-                    width=int(data[1], 36),
-                    type=int(data[0], 36),
-                    channel=int(match.group(3), 36),
-                    decoration=False,
-                )
-
-        elif match := re.match(r'^(\d\d\d)5(.)$', self.header):
-            for beat, data in self.parse_score_data():
-                yield Directional(
-                    bar=int(match.group(1)) + beat,
-                    lane=int(match.group(2), 36),
-                    width=int(data[1], 36),
-                    type=int(data[0], 36),
-                )
+        yield SpeedDefinition(id=id, items=sorted(items, key=lambda item: (item.bar, item.tick)))
 
-        elif match := re.match(r'^(\d\d\d)9(.)(.)$', self.header):
-            for beat, data in self.parse_score_data():
-                yield Slide(
-                    bar=int(match.group(1)) + beat,
-                    lane=int(match.group(2), 36),
-                    width=int(data[1], 36),
-                    type=int(data[0], 36),
-                    channel=int(match.group(3), 36),
-                    decoration=True,
-                )
+    def parse_notes(self, cls: type[Note], bar: int, lane: int, **kwargs):
+        for beat, data in self.parse_score_data():
+            yield cls(
+                bar=bar + beat,
+                lane=lane,
+                width=int(data[1], 36),
+                type=int(data[0], 36),
+                **kwargs,
+            )
 
     def parse_score_data(self):
         for i in range(0, len(self.data), 2):
             if self.data[i: i+2] != '00':
                 yield Fraction(i, len(self.data)), self.data[i: i+2]
+
+
+_meta_pattern = re.compile(r'^#(\w+)\s+(.*)$')
+_score_pattern = re.compile(r'^#(\w+):\s*(.*)$')
+_ticks_per_beat_pattern = re.compile(r'^"ticks_per_beat\s+(\d+)"$')
+_speed_item_pattern = re.compile(r'(\d+)\'(\d+):(\S+)')
+_string_pattern = re.compile(r'(["\'])((?:(?!\1)[^\\\n]|\\.)*)\1', re.DOTALL)
+_int_pattern = re.compile(r'[+-]?(?:[1-9](?:_?[0-9])*|0(?:_?0)*)', re.ASCII)
+_float_pattern = re.compile(
+    r'[+-]?(?:(?:[0-9](?:_?[0-9])*)?\.[0-9](?:_?[0-9])*|[0-9](?:_?[0-9])*\.)(?:[eE][+-]?[0-9](?:_?[0-9])*)?'
+    r'|[+-]?[0-9](?:_?[0-9])*[eE][+-]?[0-9](?:_?[0-9])*',
+    re.ASCII,
+)
+
+
+def _is_word(s: str) -> bool:
+    # same character class as \w for str patterns
+    return s.replace('_', 'a').isalnum()
+
+
+def _tokenize(line: str) -> tuple[str, str, str]:
+    if not line.startswith('#'):
+        return 'comment', 'comment', line
+
+    # fast path: `#HEADER:data` and `#HEADER data` split at a fixed delimiter
+    colon = line.find(':')
+    if colon > 1 and _is_word(line[1:colon]):
+        return 'score', line[1:colon], line[colon + 1:].lstrip()
+
+    space = line.find(' ')
+    if space > 1 and _is_word(line[1:space]):
+        return 'meta', line[1:space], line[space + 1:].lstrip()
+
+    # fallback: other whitespace as delimiter, or no header at all
+    if match := _meta_pattern.match(line):
+        return 'meta', *match.groups()
+
+    if match := _score_pattern.match(line):
+        return 'score', *match.groups()
+
+    return 'comment', 'comment', line
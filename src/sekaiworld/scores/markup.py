@@ -0,0 +1,243 @@
+'''
+SVG markup built directly as strings.
+
+A drop-in for the part of svgwrite that `drawing` uses, emitting the same
+markup as svgwrite does: attributes sorted and stringified with `str`, None
+and empty values left out, and escaped as ElementTree escapes them. Leaf
+elements are formatted the moment they are created; only `Drawing` and its
+defs stay mutable until they are written.
+'''
+
+import xml.etree.ElementTree
+
+__all__ = ['Drawing', 'Image', 'Use', 'Line', 'Rect', 'Text', 'Path', 'Style', 'tostring', 'body']
+
+
+class Drawing:
+
+    def __init__(self, size=('100%', '100%'), **extra):
+        self.attribs = _attribs(extra)
+        self.attribs['width'], self.attribs['height'] = size
+        self.attribs['xmlns'] = 'http://www.w3.org/2000/svg'
+        self.attribs['xmlns:xlink'] = 'http://www.w3.org/1999/xlink'
+        self.attribs['xmlns:ev'] = 'http://www.w3.org/2001/xml-events'
+        self.attribs['baseProfile'] = 'full'
+        self.attribs['version'] = '1.1'
+
+        self.defs = Defs()
+        self.elements: list = [self.defs]
+
+    @classmethod
+    def from_body(cls, body: str, size=('100%', '100%'), **extra) -> 'Drawing':
+        '''
+        A drawing of the markup `body` of another, defs included.
+        '''
+        drawing = cls(size, **extra)
+        drawing.elements = [body]
+        return drawing
+
+    def __getitem__(self, key: str):
+        return self.attribs[key]
+
+    def __setitem__(self, key: str, value):
+        self.attribs[key] = value
+
+    def add(self, element):
+        self.elements.append(element if isinstance(element, (str, Defs)) else tostring(element))
+        return element
+
+    def rect(self, insert=(0, 0), size=(1, 1), **extra) -> str:
+        return Rect(insert=insert, size=size, **extra)
+
+    def line(self, start=(0, 0), end=(0, 0), **extra) -> str:
+        return Line(start=start, end=end, **extra)
+
+    def text(self, text, insert=None, **extra) -> str:
+        return Text(text, insert=insert, **extra)
+
+    def style(self, content: str = '') -> str:
+        return Style(content)
+
+    def fragments(self):
+        '''
+        The markup of this drawing, in pieces, in order.
+        '''
+        yield _start_tag('svg', self.attribs)
+        for element in self.elements:
+            if isinstance(element, Defs):
+                yield from element.fragments()
+            else:
+                yield element
+        yield '</svg>'
+
+    def tostring(self) -> str:
+        return ''.join(self.fragments())
+
+    def get_xml(self):
+        return xml.etree.ElementTree.fromstring(self.tostring())
+
+    def write(self, f):
+        f.write('<?xml version="1.0" encoding="utf-8" ?>\n')
+        for fragment in self.fragments():
+            f.write(fragment)
+
+    def saveas(self, filename: str):
+        with open(filename, 'w', encoding='utf-8') as f:
+            self.write(f)
+
+
+class Defs:
+
+    def __init__(self):
+        self.elements: list[str] = []
+
+    def add(self, element):
+        self.elements.append(tostring(element))
+        return element
+
+    def fragments(self):
+        if not self.elements:
+            yield '<defs />'
+            return
+
+        yield '<defs>'
+        yield from self.elements
+        yield '</defs>'
+
+
+def Image(href, insert=None, size=None, **extra) -> str:
+    attribs = _attribs(extra)
+    attribs['xlink:href'] = href
+    _insert(attribs, insert, size)
+    return _element('image', attribs)
+
+
+def Use(href, insert=None, size=None, **extra) -> str:
+    attribs = _attribs(extra)
+    attribs['xlink:href'] = href
+    _insert(attribs, insert, size)
+    return _element('use', attribs)
+
+
+def Line(start=(0, 0), end=(0, 0), **extra) -> str:
+    attribs = _attribs(extra)
+    attribs['x1'], attribs['y1'] = start
+    attribs['x2'], attribs['y2'] = end
+    return _element('line', attribs)
+
+
+def Rect(insert=(0, 0), size=(1, 1), **extra) -> str:
+    attribs = _attribs(extra)
+    _insert(attribs, insert, size)
+    return _element('rect', attribs)
+
+
+def Text(text, insert=None, **extra) -> str:
+    attribs = _attribs(extra)
+    if insert is not None:
+        attribs['x'], attribs['y'] = str(insert[0]), str(insert[1])
+    return _element('text', attribs, _escape_cdata(str(text)))
+
+
+def Path(d=None, **extra) -> str:
+    attribs = _attribs(extra)
+    attribs['d'] = ' '.join(_flatten(d))
+    return _element('path', attribs)
+
+
+def Style(content: str = '') -> str:
+    return _element('style', {'type': 'text/css'}, content and f'<![CDATA[{content}]]>')
+
+
+def tostring(element) -> str:
+    '''
+    The markup of `element`: as it is if it is markup already, else of its
+    ElementTree xml, e.g. of a svgwrite element.
+    '''
+    if isinstance(element, str):
+        return element
+    if isinstance(element, Drawing):
+        return element.tostring()
+    if isinstance(markup := getattr(element, 'markup', None), str):
+        return markup
+    return xml.etree.ElementTree.tostring(element.get_xml(), encoding='unicode')
+
+
+def body(element) -> str:
+    '''
+    The markup inside the outermost tag of `element`.
+    '''
+    markup = tostring(element)
+    # attribute values have their '>' escaped, the first one closes the tag
+    return markup[markup.index('>') + 1:markup.rindex('<')]
+
+
+def _attribs(extra: dict) -> dict:
+    # the same keyword rules as svgwrite: class_ -> class, clip_path -> clip-path
+    extra.pop('debug', None)
+    return {key.rstrip('_').replace('_', '-'): value for key, value in extra.items()}
+
+
+def _insert(attribs: dict, insert, size):
+    if insert is not None:
+        attribs['x'], attribs['y'] = insert
+    if size is not None:
+        attribs['width'], attribs['height'] = size
+
+
+def _start_tag(name: str, attribs: dict) -> str:
+    return f'<{name}{_format_attribs(attribs)}>'
+
+
+def _element(name: str, attribs: dict, content: str | None = None) -> str:
+    if content:
+        return f'<{name}{_format_attribs(attribs)}>{content}</{name}>'
+    return f'<{name}{_format_attribs(attribs)} />'
+
+
+def _format_attribs(attribs: dict) -> str:
+    parts = []
+    for key in sorted(attribs):
+        value = attribs[key]
+        if value is not None and (value := str(value)):
+            parts.append(f' {key}="{_escape_attrib(value)}"')
+    return ''.join(parts)
+
+
+def _flatten(values):
+    # as svgwrite.utils.strlist does with path commands
+    if isinstance(values, str):
+        yield values
+    elif hasattr(values, '__iter__'):
+        for value in values:
+            yield from _flatten(value)
+    elif values is not None:
+        yield str(values)
+
+
+def _escape_attrib(text: str) -> str:
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    if '"' in text:
+        text = text.replace('"', '&quot;')
+    if '\r' in text:
+        text = text.replace('\r', '&#13;')
+    if '\n' in text:
+        text = text.replace('\n', '&#10;')
+    if '\t' in text:
+        text = text.replace('\t', '&#09;')
+    return text
+
+
+def _escape_cdata(text: str) -> str:
+    if '&' in text:
+        text = text.replace('&', '&amp;')
+    if '<' in text:
+        text = text.replace('<', '&lt;')
+    if '>' in text:
+        text = text.replace('>', '&gt;')
+    return text
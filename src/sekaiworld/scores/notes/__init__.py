@@ -4,3 +4,4 @@ from .tap import Tap, TapType
 from .directional import Directional, DirectionalType
 from .slide import Slide, SlideType
 from .event import Event
+from .flags import NoteFlags
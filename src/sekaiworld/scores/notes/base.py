@@ -3,12 +3,16 @@ import dataclasses
 from ..types import *
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class BaseNote:
     bar: Fraction
 
     def __hash__(self) -> int:
-        return hash(str(self))
+        return hash(self.bar)
+
+    def sort_key(self) -> tuple[float, Fraction]:
+        # the float orders almost every pair at C level, the exact bar breaks ties
+        return float(self.bar), self.bar
 
     def __gt__(self, other: 'BaseNote') -> bool:
         return self.bar > other.bar
@@ -4,12 +4,11 @@ import dataclasses
 from .note import Note
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Directional(Note):
     tap: Note | None = dataclasses.field(default=None, repr=False)
 
-    def __hash__(self) -> int:
-        return hash(str(self))
+    __hash__ = Note.__hash__
 
     def is_critical(self):
         if self.tap and self.tap.is_critical():
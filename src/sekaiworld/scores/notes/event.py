@@ -4,7 +4,7 @@ from .base import BaseNote
 from ..types import Fraction
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Event(BaseNote):
     bpm: Fraction = None
     bar_length: Fraction = None
@@ -22,7 +22,7 @@ class Event(BaseNote):
             self.bar_length = Fraction(self.bar_length)
 
     def __hash__(self) -> int:
-        return hash(str(self))
+        return hash((self.bar, self.bpm, self.bar_length, self.sentence_length, self.speed, self.section, self.text))
 
     def __or__(self, other: 'Event'):
         assert self.bar <= other.bar
@@ -0,0 +1,69 @@
+import enum
+
+
+class NoteFlags(enum.IntFlag):
+    '''
+    What `is_critical`, `is_trend`, `is_none`, `is_tick` and `is_path` say
+    about a linked note, and the notes sprite it is drawn with, in one int.
+    '''
+
+    CRITICAL = 1
+    TREND = 2
+    NONE = 4
+    TICK = 8  # is_tick() is True
+    TICKLESS = 16  # is_tick() is False
+    PATH = 32  # a slide the path runs through
+
+    @property
+    def sprite(self) -> int | None:
+        '''
+        The number in `notes-{number}-{width}`, None for notes not drawn.
+        '''
+        return (self >> _sprite_shift) - 1 if self >> _sprite_shift else None
+
+    @property
+    def tick(self) -> bool | None:
+        return True if self & NoteFlags.TICK else False if self & NoteFlags.TICKLESS else None
+
+    @classmethod
+    def of(cls, note) -> 'NoteFlags':
+        from .directional import Directional
+        from .slide import Slide, SlideType
+
+        flags = cls(0)
+
+        if critical := note.is_critical():
+            flags |= cls.CRITICAL
+        if trend := note.is_trend():
+            flags |= cls.TREND
+        if none := note.is_none():
+            flags |= cls.NONE
+
+        match note.is_tick():
+            case True:
+                flags |= cls.TICK
+            case False:
+                flags |= cls.TICKLESS
+
+        if isinstance(note, Slide) and note.is_path():
+            flags |= cls.PATH
+
+        if none:
+            return flags
+
+        if trend:
+            sprite = 5 if critical else 6 if isinstance(note, Directional) else 4
+        elif critical:
+            sprite = 0
+        elif isinstance(note, Directional):
+            sprite = 3
+        elif isinstance(note, Slide):
+            sprite = 3 if note.type == SlideType.END and note.directional else 1
+        else:
+            sprite = 2
+
+        return flags | sprite + 1 << _sprite_shift
+
+
+# bits from here on hold the sprite number + 1, 0 for no sprite
+_sprite_shift = 6
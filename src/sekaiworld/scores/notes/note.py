@@ -1,9 +1,10 @@
 import dataclasses
 
 from .base import BaseNote
+from .flags import NoteFlags
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Note(BaseNote):
     lane: int
     width: int
@@ -12,8 +13,11 @@ class Note(BaseNote):
     # TODO: speed is not binded to notes in pjsekai
     speed: float | None = None
 
+    # the is_* answers of the linked note, set once its links are final
+    flags: NoteFlags | None = dataclasses.field(default=None, kw_only=True, repr=False, compare=False)
+
     def __hash__(self) -> int:
-        return hash(str(self))
+        return hash((self.bar, self.lane, self.width, self.type, self.speed))
 
     def is_critical(self):
         return False
@@ -4,7 +4,7 @@ import dataclasses
 from .note import Note
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Slide(Note):
     channel: int = 0
     decoration: bool = False
@@ -15,7 +15,7 @@ class Slide(Note):
     head: Note | None = dataclasses.field(default=None, repr=False)
 
     def __hash__(self) -> int:
-        return hash(str(self))
+        return hash((self.bar, self.lane, self.width, self.type, self.speed, self.channel, self.decoration))
 
     def is_path(self):
         if self.type == 0:
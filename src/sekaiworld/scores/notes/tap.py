@@ -4,11 +4,10 @@ import dataclasses
 from .note import Note
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Tap(Note):
 
-    def __hash__(self) -> int:
-        return hash(str(self))
+    __hash__ = Note.__hash__
 
     def is_critical(self):
         if self.type in (TapType.CRITICAL, TapType.CRITICAL_TREND, TapType.CRITICAL_CANCEL):
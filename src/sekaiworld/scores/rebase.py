@@ -1,4 +1,5 @@
 import json
+import collections
 import dataclasses
 
 from .notes import *
@@ -6,8 +7,10 @@ from .types import *
 
 from .score import *
 from .meta import *
+from .tempo import *
+from .lyric import *
 
-__all__ = ['Rebase']
+__all__ = ['Rebase', 'TimeWarp']
 
 
 @dataclasses.dataclass
@@ -42,53 +45,160 @@ class Rebase:
             meta=Meta(**d.get('meta', {})),
         )
 
-    def __call__(rebase, self: Score) -> Score:
+    def key(rebase) -> tuple:
+        '''
+        Everything the time mapping of this rebase depends on.
+        '''
+        return rebase.offset, tuple((event.bar, event.bpm, event.bar_length) for event in rebase.events)
+
+    def __call__(rebase, self: Score, relink: bool = False) -> Score:
+        if relink:
+            return rebase.relink(self)
+
+        return rebase.sweep(self)
+
+    def sweep(rebase, self: Score) -> Score:
+        '''
+        Move every note and event in one sorted sweep over both tempo maps,
+        then link the moved notes as `relink` does.
+        '''
         score = Score()
         score.meta = self.meta | rebase.meta
         score.events = rebase.events
 
-        def rebase_note(note_0: Note):
-            return dataclasses.replace(
-                note_0,
-                bar=score.get_bar_by_time(self.get_time(note_0.bar) - rebase.offset),
-                **{
-                    key: None
-                    for key in {
-                        Tap: [],
-                        Directional: ['tap'],
-                        Slide: ['tap', 'directional', 'next', 'head'],
-                    }[type(note_0)]
-                },
-            )
-
-        for note_0 in self.notes:
-            if isinstance(note_0, Tap):
-                score.notes.append(rebase_note(note_0))
-
-            elif isinstance(note_0, Directional):
-                score.notes.append(rebase_note(note_0))
-                if note_0.tap:
-                    score.notes.append(rebase_note(note_0.tap))
-
-            elif isinstance(note_0, Slide):
-                score.notes.append(rebase_note(note_0))
-                if note_0.tap:
-                    score.notes.append(rebase_note(note_0.tap))
-                if note_0.directional:
-                    score.notes.append(rebase_note(note_0.directional))
-                    if note_0.directional.tap and note_0.directional.tap is not note_0.tap:
-                        score.notes.append(rebase_note(note_0.directional.tap))
+        notes_0 = _linked_notes(self)
+        events_0 = [event for event in self.events if event.speed or event.text]
+
+        warp = TimeWarp.get(rebase, self.tempo_map)
+        bars = warp.map([note.bar for note in notes_0] + [event.bar for event in events_0])
+
+        # linking again, not carrying links over: a moved note may link
+        # differently, e.g. a tap to the directional it was not merged into
+        score.notes = sorted([_moved(note_0, bars[note_0.bar]) for note_0 in notes_0], key=BaseNote.sort_key)
+        score.events = sorted(score.events + [
+            dataclasses.replace(event, bar=bars[event.bar])
+            for event in events_0
+        ], key=BaseNote.sort_key)
+
+        score._init_notes()
+        score._init_events()
+        return score
+
+    def rebase_lyric(rebase, self: Score, lyric: Lyric) -> Lyric:
+        '''
+        Move lyrics written against `self` onto the rebased timeline.
+        '''
+        return TimeWarp.get(rebase, self.tempo_map).warp_lyric(lyric)
+
+    def relink(rebase, self: Score) -> Score:
+        '''
+        Move every note on its own and link the moved notes from scratch.
+        '''
+        score = Score()
+        score.meta = self.meta | rebase.meta
+        score.events = rebase.events
+
+        score.notes = [
+            _moved(note_0, score.get_bar_by_time(self.get_time(note_0.bar) - rebase.offset))
+            for note_0 in _linked_notes(self)
+        ]
 
         score.events = sorted(score.events + [
             dataclasses.replace(event, bar=score.get_bar_by_time(self.get_time(event.bar) - rebase.offset))
             for event in self.events
             if event.speed or event.text
-        ])
+        ], key=BaseNote.sort_key)
 
-        score.notes.sort(key=lambda note: note.bar)
+        score.notes.sort(key=BaseNote.sort_key)
         score._init_notes()
         score._init_events()
         return score
 
     def rebase(rebase, self: Score) -> Score:
         return rebase(self)
+
+
+class TimeWarp:
+    '''
+    Compiled bar -> bar mapping of a rebase applied to a source tempo map.
+
+    Mapped bars are memoized, so all difficulties of a song (same tempo map,
+    same rebase) share one warp through `get` and only map new bars.
+    '''
+
+    cache: collections.OrderedDict[tuple, 'TimeWarp'] = collections.OrderedDict()
+    cache_size = 32
+
+    def __init__(self, rebase: Rebase, source: TempoMap):
+        self.offset = rebase.offset
+        self.source = source
+        self.target = TempoMap(rebase.events)
+        self.key = (rebase.key(), source.key())
+        self.bars: dict[Fraction, Fraction] = {}
+
+    @classmethod
+    def get(cls, rebase: Rebase, source: TempoMap) -> 'TimeWarp':
+        key = (rebase.key(), source.key())
+        if key in cls.cache:
+            cls.cache.move_to_end(key)
+            return cls.cache[key]
+
+        warp = cls.cache[key] = cls(rebase, source)
+        if len(cls.cache) > cls.cache_size:
+            cls.cache.popitem(last=False)
+
+        return warp
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __eq__(self, other: 'TimeWarp') -> bool:
+        return isinstance(other, TimeWarp) and self.key == other.key
+
+    def __call__(self, bar: Fraction) -> Fraction:
+        return self.map([bar])[bar]
+
+    def map(self, bars: list[Fraction]) -> dict[Fraction, Fraction]:
+        '''
+        The warped bar of each of `bars`, mapping the new ones in one sweep.
+        '''
+        new = sorted({bar for bar in bars if bar not in self.bars}, key=lambda bar: (float(bar), bar))
+        if new:
+            times = [t - self.offset for t in self.source.sweep_times(new)]
+            self.bars.update(zip(new, self.target.sweep_bars_by_time(times)))
+
+        return {bar: self.bars[bar] for bar in bars}
+
+    def warp_lyric(self, lyric: Lyric) -> Lyric:
+        bars = self.map([word.bar for word in lyric.words])
+
+        warped = Lyric()
+        warped.words = [dataclasses.replace(word, bar=bars[word.bar]) for word in lyric.words]
+        return warped
+
+
+def _linked_notes(score: Score) -> list[Note]:
+    '''
+    The notes a rebase moves: every listed note followed by its tap and
+    directional, and the tap of that directional.
+    '''
+    notes = []
+    for note in score.notes:
+        notes.append(note)
+        if isinstance(note, Directional | Slide) and note.tap:
+            notes.append(note.tap)
+        if isinstance(note, Slide) and note.directional:
+            notes.append(note.directional)
+            if note.directional.tap and note.directional.tap is not note.tap:
+                notes.append(note.directional.tap)
+
+    return notes
+
+
+def _moved(note: Note, bar: Fraction) -> Note:
+    # an unlinked copy at `bar`
+    return dataclasses.replace(note, bar=bar, **{
+        key: None
+        for key in ('tap', 'directional', 'next', 'head')
+        if hasattr(note, key)
+    })
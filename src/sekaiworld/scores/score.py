@@ -1,11 +1,18 @@
+import io
+import copy
+import codecs
+import math
 import bisect
 import functools
+import typing
+import dataclasses
 
 from .notes import *
 from .types import *
 
 from .meta import *
 from .line import *
+from .tempo import *
 
 __all__ = ['Score']
 
@@ -17,7 +24,34 @@ class Score:
         self.notes: list[Note] = []
         self.events: list[Event] = []
 
-    def _init_by_lines(self, lines: list[Line]):
+    # cached views of the notes and events, rebuilt on first use
+    _derived = ('tempo_map', 'tick_timeline', 'tick_labels', 'slide_chains', 'bar_index', 'link_index')
+
+    def __getstate__(self) -> dict:
+        state = {key: value for key, value in self.__dict__.items() if key not in self._derived}
+
+        # links go as indexes into unlinked copies: pickled as references,
+        # a slide chain nests one level deeper for every slide
+        notes = self.all_notes()
+        indexes: dict[int, int] = {id(note): i for i, note in enumerate(notes)}
+        state['notes'] = [_unlink(copy.copy(note)) for note in notes]
+        state['links'] = [tuple(
+            indexes[id(link)] if (link := getattr(note, key, None)) is not None else -1
+            for key in _link_keys
+        ) for note in notes]
+        state['n_listed'] = len(self.notes)
+        return state
+
+    def __setstate__(self, state: dict):
+        notes, links, n_listed = state.pop('notes'), state.pop('links'), state.pop('n_listed')
+        for note, indexes in zip(notes, links):
+            for key, i in zip(_link_keys, indexes):
+                if i >= 0:
+                    setattr(note, key, notes[i])
+
+        self.__dict__.update(state, notes=notes[:n_listed])
+
+    def _init_by_lines(self, lines: typing.Iterable[Line]):
         self.meta = Meta()
         self.notes = []
         self.events = []
@@ -61,146 +95,387 @@ class Score:
         self._init_events()
 
     def _init_notes(self):
-        self.notes.sort()
+        self.notes.sort(key=BaseNote.sort_key)
 
-        note_deleted = [False] * len(self.notes)
-        note_indexes: dict[Fraction, list[int]] = {}
-
-        for i, note in enumerate(self.notes):
-            if not 0 <= note.lane - 2 < 12:
-                note_deleted[i] = True
-                self.events.append(Event(
-                    bar=note.bar,
-                    text='SKILL' if note.lane == 0 else 'FEVER CHANCE!' if note.type == 1 else 'SUPER FEVER!!',
-                ))
-                continue
+        notes = []
+        for note in self.notes:
+            if 0 <= note.lane - 2 < 12:
+                notes.append(note)
+            else:
+                self.events.append(_skill_event(note))
 
-            if note.bar not in note_indexes:
-                note_indexes[note.bar] = []
+        self.notes = _link(notes)
 
-            note_indexes[note.bar].append(i)
+    def _init_events(self):
+        self.events.sort(key=BaseNote.sort_key)
+        events = []
 
-        for i, directional in enumerate(self.notes):
-            if note_deleted[i] or not isinstance(directional, Directional):
-                continue
+        for event in self.events:
+            if len(events) and event == events[-1]:
+                events[-1] |= event
+            else:
+                events.append(event)
 
-            for j in note_indexes[directional.bar]:
-                tap = self.notes[j]
-                if note_deleted[j] or not isinstance(tap, Tap):
-                    continue
+        self.events = events
 
-                if tap.bar == directional.bar and tap.lane == directional.lane and tap.width == directional.width:
-                    note_deleted[j] = True
-                    directional.tap = tap
+        # drop what was derived from the old events
+        self.__dict__.pop('tempo_map', None)
+        self.__dict__.pop('tick_timeline', None)
+        self.__dict__.pop('tick_labels', None)
 
-        for i, slide in enumerate(self.notes):
-            if note_deleted[i] or not isinstance(slide, Slide):
-                continue
+    @functools.cached_property
+    def link_index(self) -> 'LinkIndex':
+        '''
+        Lookup of the notes an edit has to relink, built on the first edit.
+        '''
+        return LinkIndex(self.all_notes())
+
+    def add_note(self, note: Note) -> tuple[Fraction, Fraction | None]:
+        '''
+        Add an unlinked note, relinking only the slide chains and the
+        tap/directional groups it touches.
+
+        Like every edit, returns the bar range `(bar_from, bar_to)` whose
+        drawing changed, `bar_to` being None for "to the end". It starts at
+        the nearest earlier note with a tick, if any, whose tick label counts
+        up to the edit.
+        '''
+        if not 0 <= note.lane - 2 < 12:
+            return self.add_event(_skill_event(note))
+
+        return self._relink(added=[note])
+
+    def remove_note(self, note: Note) -> tuple[Fraction, Fraction | None]:
+        '''
+        Remove a note, listed or linked into another one.
+        '''
+        return self._relink(removed=[note])
+
+    def move_note(self, note: Note, **changes) -> tuple[Fraction, Fraction | None]:
+        '''
+        Change the fields of a note in place, e.g. `bar`, `lane` or `width`.
+        Like `add_note`, a note moved off the lanes becomes a skill event.
+        '''
+        keys = {field.name for field in dataclasses.fields(note)} - {*_link_keys, 'flags'}
+        for key in changes:
+            if key not in keys:
+                raise ValueError(f'{key!r} is not a field to move {note} by')
+
+        if not 0 <= changes.get('lane', note.lane) - 2 < 12:
+            bar_from, _ = self.remove_note(note)
+            for key, value in changes.items():
+                setattr(note, key, value)
+            return min(bar_from, self.add_event(_skill_event(note))[0]), None
+
+        return self._relink(removed=[note], added=[note], changes=changes)
+
+    def add_event(self, event: Event) -> tuple[Fraction, Fraction | None]:
+        i = bisect.bisect_right(self.events, event.sort_key(), key=BaseNote.sort_key)
+        if not any(e == event for e in self.events[self._event_range(event.bar)]):
+            self.events.insert(i, event)
+
+        return self._retime(event.bar)
+
+    def remove_event(self, event: Event) -> tuple[Fraction, Fraction | None]:
+        r = self._event_range(event.bar)
+        for i in range(r.start, r.stop):
+            if self.events[i] == event:
+                del self.events[i]
+                return self._retime(event.bar)
+
+        raise ValueError(f'{event} is not in the score')
+
+    def _event_range(self, bar: Fraction) -> slice:
+        key = (float(bar), bar)
+        return slice(
+            bisect.bisect_left(self.events, key, key=BaseNote.sort_key),
+            bisect.bisect_right(self.events, key, key=BaseNote.sort_key),
+        )
+
+    def _retime(self, bar: Fraction) -> tuple[Fraction, None]:
+        # merged events carry bpm, sections and texts forward, so everything
+        # after the edit may change, but nothing before it
+        if 'tempo_map' in self.__dict__:
+            self.__dict__['tempo_map'] = self.tempo_map.updated(self.events, bar)
+        self.__dict__.pop('tick_timeline', None)
+        self.__dict__.pop('tick_labels', None)
+
+        return bar, None
+
+    def _relink(
+        self,
+        removed: list[Note] = (),
+        added: list[Note] = (),
+        changes: dict | None = None,
+    ) -> tuple[Fraction, Fraction]:
+        index = self.link_index
+
+        seeds: list[Note] = []
+        for note in removed:
+            if not index.contains(note):
+                raise ValueError(f'{note} is not in the score')
+            seeds += index.neighbours(note)
+            self._unlist(note)
+            index.remove(note)
+
+        bars = [note.bar for note in removed]
+
+        for note in added:
+            for key, value in (changes or {}).items():
+                setattr(note, key, value)
+            index.add(note)
+            seeds.append(note)
+            seeds += index.neighbours(note)
+
+        # the region is closed under links: relinking it from scratch gives
+        # what linking the whole score would, and notes outside keep theirs
+        region = index.closure(seeds)
+        bars += [note.bar for note in region]
+
+        for note in [*removed, *region]:
+            _unlink(note)
+
+        region.sort(key=BaseNote.sort_key)
+        self._splice(region, min(bars), max(bars), _link(region))
+        bars.append(self._tick_before(min(bars)))
+
+        self.__dict__.pop('tick_timeline', None)
+        self.__dict__.pop('slide_chains', None)
+        self.__dict__.pop('bar_index', None)
+        self.__dict__.pop('tick_labels', None)
+        return min(bars), max(bars)
+
+    def _tick_before(self, bar: Fraction) -> Fraction:
+        # the bar of the last listed note with a tick before `bar`, else `bar`
+        i = self._note_range(bar, bar).start
+        while i > 0:
+            i -= 1
+            if self.notes[i].flags & NoteFlags.TICK:
+                return self.notes[i].bar
+
+        return bar
+
+    def _unlist(self, note: Note):
+        r = self._note_range(note.bar, note.bar)
+        for i in range(r.start, r.stop):
+            if self.notes[i] is note:
+                del self.notes[i]
+                return
+
+    def _note_range(self, bar_from: Fraction, bar_to: Fraction) -> slice:
+        return slice(
+            bisect.bisect_left(self.notes, (float(bar_from), bar_from), key=BaseNote.sort_key),
+            bisect.bisect_right(self.notes, (float(bar_to), bar_to), key=BaseNote.sort_key),
+        )
+
+    def _splice(self, old: list[Note], bar_from: Fraction, bar_to: Fraction, new: list[Note]):
+        # replaces `old` with `new` among the listed notes in [bar_from, bar_to]
+        r = self._note_range(bar_from, bar_to)
+        old = {id(note) for note in old}
+        self.notes[r] = sorted([note for note in self.notes[r] if id(note) not in old] + new, key=BaseNote.sort_key)
 
-            if slide.head is None:
-                slide.head = slide
+    @classmethod
+    def open(cls, file: str, *args, **kwargs):
+        with open(file, *args, **kwargs) as f:
+            return cls.from_stream(f)
 
-            for j in note_indexes[slide.bar]:
-                tap = self.notes[j]
-                if note_deleted[j] or not isinstance(tap, Tap):
-                    continue
+    @classmethod
+    def from_stream(cls, lines: typing.Iterable[str]):
+        '''
+        Parse a score from any iterable of text lines, e.g. an open file.
 
-                if tap.bar == slide.bar and tap.lane == slide.lane and tap.width == slide.width:
-                    note_deleted[j] = True
-                    slide.tap = tap
+        Lines are consumed one at a time, so neither the raw text nor the
+        `Line` objects are held in memory as a whole.
+        '''
+        self = cls()
+        self._init_by_lines(Line(line) for line in lines)
+        return self
 
-            for j in note_indexes[slide.bar]:
-                directional = self.notes[j]
-                if note_deleted[j] or not isinstance(directional, Directional):
-                    continue
+    @classmethod
+    def from_string(cls, text: str):
+        return cls.from_stream(io.StringIO(text))
 
-                if directional.bar == slide.bar and directional.lane == slide.lane and directional.width == slide.width:
-                    note_deleted[j] = True
-                    slide.directional = directional
-                    if directional.tap is not None:
-                        slide.tap = directional.tap
+    @classmethod
+    def from_bytes(cls, buf: bytes, encoding: str = 'UTF-8'):
+        # a byte order mark would glue itself to the header of the first line
+        if codecs.lookup(encoding).name == 'utf-8':
+            encoding = 'utf-8-sig'
 
-            if slide.type != SlideType.END:
-                for j in range(i+1, len(self.notes)):
-                    next = self.notes[j]
-                    if note_deleted[j] or not isinstance(next, Slide) or next.channel != slide.channel or next.decoration != slide.decoration:
-                        continue
+        return cls.from_stream(io.TextIOWrapper(io.BytesIO(buf), encoding=encoding))
 
-                    slide.next = next
-                    next.head = slide.head
-                    break
+    @functools.cached_property
+    def tempo_map(self) -> TempoMap:
+        return TempoMap(self.events)
 
-        self.notes = [note for i, note in enumerate(self.notes) if not note_deleted[i]]
+    @property
+    def timed_events(self) -> list[tuple[Fraction, Event]]:
+        return list(zip(self.tempo_map.times, self.tempo_map.events))
 
-    def _init_events(self):
-        self.events.sort()
-        events = []
+    @functools.cached_property
+    def tick_timeline(self):
+        '''
+        Integer tick time base of this score, see `timeline.TickTimeline`.
+        '''
+        from .timeline import TickTimeline
+        return TickTimeline(self)
 
-        for event in self.events:
-            if len(events) and event == events[-1]:
-                events[-1] |= event
-            else:
-                events.append(event)
+    @functools.cached_property
+    def bar_index(self) -> 'BarIndex':
+        '''
+        Listed notes bucketed by bar, see `BarIndex`.
+        '''
+        return BarIndex(self.notes, self.slide_chains)
 
-        self.events = events
+    @functools.cached_property
+    def slide_chains(self) -> list['SlideChain | None']:
+        '''
+        The chain of every listed note, by index, shared by the slides of
+        one chain. None for notes that are not slides.
+        '''
+        chains: list[SlideChain | None] = [None] * len(self.notes)
+        # only while building: ids do not survive copies of the score
+        by_head: dict[int, SlideChain] = {}
 
-    @classmethod
-    def open(cls, file: str, *args, **kwargs):
-        self = cls()
-        with open(file, *args, **kwargs) as f:
-            self._init_by_lines([Line(line) for line in f.readlines()])
+        for i, note in enumerate(self.notes):
+            if isinstance(note, Slide):
+                if (chain := by_head.get(id(note.head))) is None:
+                    chain = by_head[id(note.head)] = SlideChain.from_head(note.head)
+                chains[i] = chain
 
-        return self
+        return chains
 
     @functools.cached_property
-    def timed_events(self):
-        timed_events: list[tuple[Fraction, Event]] = []
+    def tick_labels(self) -> list[str | None]:
+        '''
+        Tick text of every listed note, by index, see `get_tick_label`.
+        None for notes without a tick.
+        '''
+        notes = self.notes
+        ticks = [note.flags.tick for note in notes]
+        labels: list[str | None] = [None] * len(notes)
+
+        # one backward pass: the next tick of a note is the first tick at
+        # the nearest later bar that has one
+        upcoming = None
+        first = None
+        for i in reversed(range(len(notes))):
+            note = notes[i]
+            if i + 1 < len(notes) and notes[i + 1].bar != note.bar:
+                if first is not None:
+                    upcoming = first
+                first = None
+
+            if ticks[i]:
+                first = i
+                next = notes[upcoming] if upcoming is not None else note
+            elif ticks[i] is None:
+                continue
+            else:
+                next = None
+
+            labels[i] = self.get_tick_label(note, next)
+
+        return labels
+
+    def get_tick_label(self, note: Note, next: Note | None = None) -> str | None:
+        '''
+        The interval from `note` to the `next` tick in beats, e.g. '/4' or
+        '3/8'. '' without a next tick, None if the interval rounds to 0.
+        '''
+        if next is None:
+            return ''
 
-        t = 0
-        e = Event(bar=0, bpm=120, bar_length=4, sentence_length=4)
-        for i, event in enumerate(self.events):
-            t += (event.bar - e.bar) * e.bar_length * 60 / e.bpm
-            e |= event
+        if (
+            next is note or
+            next.bar == note.bar or
+            next.bar - note.bar > 1 or
+            next.bar - note.bar > 0.5 and int(next.bar) != int(note.bar)
+        ):
+            interval = math.floor(note.bar + 1) - note.bar
+        else:
+            interval = next.bar - note.bar
 
-            timed_events.append((t, e))
+        interval = interval * self.get_event(note.bar).bar_length / 4
+        interval = interval.limit_denominator(100)
 
-        if not timed_events:
-            timed_events.append((0, e))
+        if interval == 0:
+            return None
 
-        return timed_events
+        return '%g/%g' % (interval.numerator, interval.denominator) if interval.numerator != 1 else \
+            '/%g' % (interval.denominator,)
 
     def get_timed_event(self, bar: Fraction) -> tuple[Fraction, Event]:
-        t, e = self.timed_events[bisect.bisect(self.timed_events, bar, key=lambda x: x[1].bar) - 1]
-        t += e.bar_length * 60 / e.bpm * (bar - e.bar)
-        return t, e
+        return self.tempo_map.get_timed_event(bar)
 
     def get_time(self, bar: Fraction) -> Fraction:
-        return self.get_timed_event(bar)[0]
+        return self.tempo_map.get_time(bar)
+
+    def get_time_float(self, bar: float) -> float:
+        return self.tempo_map.get_time_float(bar)
 
     def get_event(self, bar: Fraction) -> Event:
-        return self.get_timed_event(bar)[1]
+        return self.tempo_map.get_event(bar)
 
     def get_time_delta(self, bar_from: Fraction, bar_to: Fraction) -> Fraction:
         return self.get_time(bar_to) - self.get_time(bar_from)
 
     def get_bar_by_time(self, time: float) -> Fraction:
-        t = 0.0
-        event = Event(bar=0, bpm=120, bar_length=4, sentence_length=4)
-
-        for i in range(len(self.events)):
-            event = event | self.events[i]
-            if i+1 == len(self.events):
-                break
-
-            event_time = event.bar_length * 60 / event.bpm * (self.events[i+1].bar - event.bar)
-            if t + event_time > time:
-                break
-            else:
-                t += event_time
-
-        bar = event.bar + (time - t) / (event.bar_length * 60 / event.bpm)
+        return self.tempo_map.get_bar_by_time(time)
+
+    def get_times(self, bars=None, exact: bool = False):
+        '''
+        `get_time` of each of `bars`, by default the bars of `notes`: a
+        float64 array of seconds, which requires numpy, or with `exact` a
+        list of fractions.
+        '''
+        if bars is None:
+            bars = [note.bar for note in self.notes]
+
+        if exact:
+            return self.tempo_map.sweep_times(bars)
+
+        return self.tempo_map.times_for(bars)
+
+    def get_bars(self, times):
+        '''
+        Inverse of `get_times`: the bar at each of float64 `times`, as floats.
+        Requires numpy.
+        '''
+        return self.tempo_map.bars_for(times)
+
+    def all_notes(self) -> list[Note]:
+        '''
+        `notes` followed by the notes only reachable through links (the taps
+        and directionals merged into other notes), each exactly once.
+        '''
+        notes: list[Note] = list(self.notes)
+        seen: set[int] = {id(note) for note in notes}
+
+        i = 0
+        while i < len(notes):
+            for key in _link_keys:
+                note = getattr(notes[i], key, None)
+                if note is not None and id(note) not in seen:
+                    seen.add(id(note))
+                    notes.append(note)
+            i += 1
+
+        return notes
+
+    def to_arrays(self):
+        '''
+        Columnar view of all notes, see `arrays.NoteArrays`. Requires numpy.
+        '''
+        from .arrays import NoteArrays
+        return NoteArrays.from_score(self)
 
-        return Fraction(bar).limit_denominator()
+    @classmethod
+    def from_arrays(cls, arrays, events: list[Event] | None = None, meta: Meta | None = None):
+        self = cls()
+        self.notes = arrays.to_notes()
+        self.events = list(events or [])
+        self.meta = meta or Meta()
+        return self
 
     def print(self, bar_from: int, bar_to: int):
         for note in self.notes:
@@ -212,3 +487,244 @@ class Score:
                     print('    directional:', note.directional, f'{note.directional.is_trend() = }')
 
                 print()
+
+
+class LinkIndex:
+    '''
+    Every note of a score, linked or not, by what links them: taps,
+    directionals and slides by (bar, lane, width), and slides in order by
+    (channel, decoration).
+    '''
+
+    def __init__(self, notes: list[Note]):
+        self.groups: dict[tuple, list[Note]] = {}
+        self.channels: dict[tuple[int, bool], list[Slide]] = {}
+
+        for note in notes:
+            self.groups.setdefault(_group_key(note), []).append(note)
+            if isinstance(note, Slide):
+                self.channels.setdefault((note.channel, note.decoration), []).append(note)
+
+        for slides in self.channels.values():
+            slides.sort(key=BaseNote.sort_key)
+
+    def contains(self, note: Note) -> bool:
+        return any(n is note for n in self.groups.get(_group_key(note), ()))
+
+    def add(self, note: Note):
+        self.groups.setdefault(_group_key(note), []).append(note)
+        if isinstance(note, Slide):
+            bisect.insort(self.channels.setdefault((note.channel, note.decoration), []), note, key=BaseNote.sort_key)
+
+    def remove(self, note: Note):
+        group = self.groups[_group_key(note)]
+        group.pop(_index(group, note))
+        if isinstance(note, Slide):
+            slides = self.channels[(note.channel, note.decoration)]
+            slides.pop(_index(slides, note))
+
+    def neighbours(self, note: Note) -> list[Note]:
+        '''
+        The notes whose links may change when `note` comes or goes: its
+        group and, for a slide, the chains before and after it.
+        '''
+        notes = list(self.groups.get(_group_key(note), ()))
+        if isinstance(note, Slide):
+            slides = self.channels[(note.channel, note.decoration)]
+            i = _index(slides, note)
+            notes += slides[max(i - 1, 0):i + 2]
+            notes += _chain(note)
+
+        return notes
+
+    def closure(self, seeds: list[Note]) -> list[Note]:
+        '''
+        The indexed notes reachable from `seeds` through groups and chains.
+        '''
+        region: dict[int, Note] = {}
+        stack = list(seeds)
+        while stack:
+            note = stack.pop()
+            if id(note) in region or not self.contains(note):
+                continue
+
+            region[id(note)] = note
+            stack += self.groups[_group_key(note)]
+            if isinstance(note, Slide):
+                stack += _chain(note)
+
+        return list(region.values())
+
+
+class BarIndex:
+    '''
+    Indexes into a list of listed notes, bucketed by integer bar. A slide is
+    put into every bucket its chain passes through, so a range query finds
+    it even when none of its own points are in range.
+    '''
+
+    def __init__(self, notes: list[Note], chains: list['SlideChain | None']):
+        self.buckets: dict[int, list[int]] = {}
+
+        for i, note in enumerate(notes):
+            bar_from = bar_to = note.bar
+            if (chain := chains[i]) is not None:
+                bar_from, bar_to = chain.bar_from, chain.bar_to
+
+            for bucket in range(math.floor(bar_from), math.floor(bar_to) + 1):
+                self.buckets.setdefault(bucket, []).append(i)
+
+    def query(self, bar_from: Fraction, bar_to: Fraction) -> list[int]:
+        '''
+        Ascending indexes of the notes at, or with chains passing through,
+        bars [bar_from, bar_to]. May include a few neighbours just outside.
+        '''
+        indexes = set()
+        for bucket in range(math.floor(bar_from), math.floor(bar_to) + 1):
+            indexes.update(self.buckets.get(bucket, ()))
+
+        return sorted(indexes)
+
+
+@dataclasses.dataclass(slots=True)
+class SlideChain:
+    '''
+    Extent of a slide chain: its head, the bars of its first and last
+    slides, and the bars of the slides its path runs through.
+    '''
+
+    head: Slide
+    bar_from: Fraction
+    bar_to: Fraction
+    path_bars: tuple[Fraction, ...]
+
+    @classmethod
+    def from_head(cls, head: Slide) -> 'SlideChain':
+        slides = _chain(head)
+        return cls(
+            head=head,
+            bar_from=min(slide.bar for slide in slides),
+            bar_to=max(slide.bar for slide in slides),
+            path_bars=tuple(slide.bar for slide in slides if slide.flags & NoteFlags.PATH),
+        )
+
+    def touches(self, bar_from: Fraction, bar_to: Fraction) -> bool:
+        '''
+        Whether a path point is in [bar_from, bar_to), or the path runs
+        from before `bar_from` to after `bar_to`.
+        '''
+        if not self.path_bars:
+            return False
+
+        first, last = self.path_bars[0], self.path_bars[-1]
+        if last < bar_from or first >= bar_to:
+            return False
+        if first >= bar_from or bar_from <= last < bar_to or last > bar_to:
+            return True
+
+        # from before `bar_from` to exactly `bar_to`
+        i = bisect.bisect_left(self.path_bars, bar_from)
+        return self.path_bars[i] < bar_to
+
+
+def _group_key(note: Note) -> tuple:
+    return note.bar, note.lane, note.width
+
+
+def _index(notes: list[Note], note: Note) -> int:
+    for i, n in enumerate(notes):
+        if n is note:
+            return i
+
+    raise ValueError(f'{note} is not in the score')
+
+
+def _chain(slide: Slide) -> list[Slide]:
+    slides = []
+    slide = slide.head
+    while slide is not None:
+        slides.append(slide)
+        slide = slide.next
+
+    return slides
+
+
+# the fields linking a note to others
+_link_keys = ('tap', 'directional', 'next', 'head')
+
+
+def _unlink(note: Note) -> Note:
+    for key in _link_keys:
+        if hasattr(note, key):
+            setattr(note, key, None)
+
+    return note
+
+
+def _skill_event(note: Note) -> Event:
+    return Event(
+        bar=note.bar,
+        text='SKILL' if note.lane == 0 else 'FEVER CHANCE!' if note.type == 1 else 'SUPER FEVER!!',
+    )
+
+
+def _link(notes: list[Note]) -> list[Note]:
+    '''
+    Link sorted, unlinked notes: taps and directionals are merged into the
+    directionals and slides at their (bar, lane, width), and slides of each
+    (channel, decoration) are chained, then every note gets its `flags`.
+    Returns the notes not merged away.
+    '''
+    note_deleted = [False] * len(notes)
+
+    # not yet merged taps and directionals, by (bar, lane, width), in note order
+    taps: dict[tuple, list[int]] = {}
+    directionals: dict[tuple, list[int]] = {}
+
+    for i, note in enumerate(notes):
+        if isinstance(note, Tap):
+            taps.setdefault((note.bar, note.lane, note.width), []).append(i)
+        elif isinstance(note, Directional):
+            directionals.setdefault((note.bar, note.lane, note.width), []).append(i)
+
+    for indexes in directionals.values():
+        for i in indexes:
+            directional = notes[i]
+            for j in taps.pop((directional.bar, directional.lane, directional.width), []):
+                note_deleted[j] = True
+                directional.tap = notes[j]
+
+    # the last slide of each (channel, decoration) still waiting for its next
+    open_slides: dict[tuple[int, bool], Slide] = {}
+
+    for i, slide in enumerate(notes):
+        if note_deleted[i] or not isinstance(slide, Slide):
+            continue
+
+        if (previous := open_slides.pop((slide.channel, slide.decoration), None)) is not None:
+            previous.next = slide
+            slide.head = previous.head
+
+        if slide.head is None:
+            slide.head = slide
+
+        key = (slide.bar, slide.lane, slide.width)
+
+        for j in taps.pop(key, []):
+            note_deleted[j] = True
+            slide.tap = notes[j]
+
+        for j in directionals.pop(key, []):
+            directional = notes[j]
+            note_deleted[j] = True
+            slide.directional = directional
+            if directional.tap is not None:
+                slide.tap = directional.tap
+
+        if slide.type != SlideType.END:
+            open_slides[(slide.channel, slide.decoration)] = slide
+
+    for note in notes:
+        note.flags = NoteFlags.of(note)
+
+    return [note for i, note in enumerate(notes) if not note_deleted[i]]
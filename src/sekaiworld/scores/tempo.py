@@ -0,0 +1,182 @@
+import copy
+import bisect
+
+from .notes import *
+from .types import *
+
+__all__ = ['TempoMap']
+
+
+class TempoMap:
+    '''
+    Bar <-> time conversion of a score, built once from its events.
+
+    Segment i starts at `bars[i]` and `times[i]` seconds and runs at
+    `seconds_per_bar[i]` under the merged event `events[i]`, so every lookup
+    is a bisect over prefix sums instead of a walk over the events.
+    '''
+
+    def __init__(self, events: list[Event]):
+        self.events: list[Event] = []
+        self.bars: list[Fraction] = []
+        self.times: list[Fraction] = []
+        self.seconds_per_bar: list[Fraction] = []
+
+        self.float_bars: list[float] = []
+        self.float_times: list[float] = []
+        self.float_seconds_per_bar: list[float] = []
+
+        # times as `get_bar_by_time` has always counted them: in floats,
+        # starting from 0.0 at the first event
+        self.legacy_times: list[float] = []
+
+        self.n_source = 0
+        self._build(events, 0)
+
+    def updated(self, events: list[Event], bar: Fraction) -> 'TempoMap':
+        '''
+        A new tempo map for `events` (the sorted events of the score) after
+        they changed from `bar` on, sharing the earlier segments of this one.
+        This one is left as it is, since `TimeWarp`s key on it.
+        '''
+        tempo_map = copy.copy(self)
+        for key, value in vars(self).items():
+            if isinstance(value, list):
+                setattr(tempo_map, key, value.copy())
+
+        i = bisect.bisect_left(self.bars, bar) if self.n_source else 0
+        tempo_map._build(events, min(i, self.n_source))
+        return tempo_map
+
+    def _build(self, events: list[Event], i: int):
+        for segments in (
+            self.events, self.bars, self.times, self.seconds_per_bar,
+            self.float_bars, self.float_times, self.float_seconds_per_bar,
+        ):
+            del segments[i:]
+        del self.legacy_times[max(i, 1):]
+
+        if i:
+            t, e = self.times[-1], self.events[-1]
+        else:
+            t, e = 0, Event(bar=0, bpm=120, bar_length=4, sentence_length=4)
+
+        for event in events[i:]:
+            t += (event.bar - e.bar) * e.bar_length * 60 / e.bpm
+            e |= event
+
+            self.events.append(e)
+            self.times.append(t)
+
+        if not self.events:
+            self.events.append(e)
+            self.times.append(0)
+
+        self.n_source = len(events)
+
+        self.bars += [e.bar for e in self.events[i:]]
+        self.seconds_per_bar += [e.bar_length * 60 / e.bpm for e in self.events[i:]]
+
+        self.float_bars += [float(bar) for bar in self.bars[i:]]
+        self.float_times += [float(t) for t in self.times[i:]]
+        self.float_seconds_per_bar += [float(x) for x in self.seconds_per_bar[i:]]
+
+        if not self.legacy_times:
+            self.legacy_times.append(0.0)
+        for j in range(len(self.legacy_times) - 1, len(events) - 1):
+            self.legacy_times.append(self.legacy_times[-1] + self.seconds_per_bar[j] * (self.bars[j + 1] - self.bars[j]))
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def key(self) -> tuple:
+        '''
+        Everything `get_time` depends on, to tell equal tempo maps apart.
+        '''
+        return tuple(zip(self.bars, self.seconds_per_bar))
+
+    def get_timed_event(self, bar: Fraction) -> tuple[Fraction, Event]:
+        # a bar before the first event falls back to the last one, as it always has
+        i = bisect.bisect(self.bars, bar) - 1
+        return self.times[i] + self.seconds_per_bar[i] * (bar - self.bars[i]), self.events[i]
+
+    def get_time(self, bar: Fraction) -> Fraction:
+        return self.get_timed_event(bar)[0]
+
+    def get_event(self, bar: Fraction) -> Event:
+        return self.events[bisect.bisect(self.bars, bar) - 1]
+
+    def get_time_float(self, bar: float) -> float:
+        bar = float(bar)
+        i = bisect.bisect(self.float_bars, bar) - 1
+        return self.float_times[i] + self.float_seconds_per_bar[i] * (bar - self.float_bars[i])
+
+    def get_bar(self, time: Fraction) -> Fraction:
+        '''
+        Exact inverse of `get_time`.
+        '''
+        i = max(bisect.bisect(self.times, time) - 1, 0)
+        return self.bars[i] + (time - self.times[i]) / self.seconds_per_bar[i]
+
+    def get_bar_by_time(self, time: float) -> Fraction:
+        '''
+        Inverse of `get_time` in float precision, rounded to a fraction.
+        Unlike `get_bar`, time 0 is at the first event rather than bar 0.
+        '''
+        i = min(bisect.bisect(self.legacy_times, time, lo=1) - 1, len(self.events) - 1)
+        bar = self.bars[i] + (time - self.legacy_times[i]) / self.seconds_per_bar[i]
+        return Fraction(bar).limit_denominator()
+
+    def sweep_times(self, bars: list[Fraction]) -> list[Fraction]:
+        '''
+        `get_time` of each bar. Ascending bars are resolved in one forward
+        sweep over the segments; out of order bars fall back to a bisect.
+        '''
+        times = []
+        i = 0
+        for bar in bars:
+            if bar < self.bars[0]:
+                j = -1
+            else:
+                if bar < self.bars[i]:
+                    i = bisect.bisect(self.bars, bar) - 1
+                while i + 1 < len(self.bars) and self.bars[i + 1] <= bar:
+                    i += 1
+                j = i
+            times.append(self.times[j] + self.seconds_per_bar[j] * (bar - self.bars[j]))
+        return times
+
+    def sweep_bars_by_time(self, times: list[float]) -> list[Fraction]:
+        '''
+        `get_bar_by_time` of each time, swept like `sweep_times`.
+        '''
+        bars = []
+        i = 0
+        for time in times:
+            if i > 0 and time < self.legacy_times[i]:
+                i = max(bisect.bisect(self.legacy_times, time) - 1, 0)
+            while i + 1 < len(self.events) and self.legacy_times[i + 1] <= time:
+                i += 1
+            bar = self.bars[i] + (time - self.legacy_times[i]) / self.seconds_per_bar[i]
+            bars.append(Fraction(bar).limit_denominator())
+        return bars
+
+    def times_for(self, bars):
+        '''
+        `get_time` over an array of bars, in float64 seconds. Requires numpy.
+        '''
+        from .arrays import np
+
+        bars = np.asarray(bars, dtype=np.float64)
+        i = np.searchsorted(self.float_bars, bars, side='right') - 1
+        return np.take(self.float_times, i) + np.take(self.float_seconds_per_bar, i) * (bars - np.take(self.float_bars, i))
+
+    def bars_for(self, times):
+        '''
+        `get_bar` over an array of float64 seconds. Requires numpy.
+        '''
+        from .arrays import np
+
+        times = np.asarray(times, dtype=np.float64)
+        i = np.maximum(np.searchsorted(self.float_times, times, side='right') - 1, 0)
+        return np.take(self.float_bars, i) + (times - np.take(self.float_times, i)) / np.take(self.float_seconds_per_bar, i)
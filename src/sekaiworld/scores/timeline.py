@@ -0,0 +1,100 @@
+import math
+import bisect
+import numbers
+
+from .notes import *
+from .types import *
+
+__all__ = ['TickTimeline']
+
+
+class TickTimeline:
+    '''
+    Integer tick time base of a score.
+
+    Each bar is split into as many ticks as the LCM of the denominators of the
+    note and event positions in it, so every position in the score is an exact
+    integer tick. Times are kept as integers in units of 1 / `time_denominator`
+    seconds; bars and times are turned back into fractions only by `bar`,
+    `get_time` and `get_time_delta`.
+    '''
+
+    def __init__(self, score):
+        resolutions: dict[int, int] = {}
+        for bar in [note.bar for note in score.all_notes()] + [event.bar for event in score.events]:
+            bar = Fraction(bar)
+            if bar >= 0:
+                i = math.floor(bar)
+                resolutions[i] = math.lcm(resolutions.get(i, 1), bar.denominator)
+
+        n_bars = max(resolutions, default=0) + 1
+
+        self.resolutions: list[int] = [resolutions.get(i, 1) for i in range(n_bars)]
+        self.offsets: list[int] = [0]
+        for resolution in self.resolutions:
+            self.offsets.append(self.offsets[-1] + resolution)
+
+        # piecewise linear time: a segment starts at every bar and every event
+        segment_bars = sorted({Fraction(i) for i in range(n_bars + 1)} | {
+            Fraction(event.bar) for event in score.events if event.bar >= 0
+        })
+        segments: list[tuple[int, Fraction, Fraction]] = []
+        for bar in segment_bars:
+            t, e = score.get_timed_event(bar)
+            seconds_per_tick = e.bar_length * 60 / e.bpm / self.resolution(math.floor(bar))
+            segments.append((self.tick(bar), t, seconds_per_tick))
+
+        self.time_denominator: int = math.lcm(*(
+            Fraction(x).denominator
+            for _, t, seconds_per_tick in segments
+            for x in (t, seconds_per_tick)
+        ))
+        self.segment_ticks: list[int] = [tick for tick, _, _ in segments]
+        self.segment_times: list[int] = [int(t * self.time_denominator) for _, t, _ in segments]
+        self.segment_rates: list[int] = [
+            int(seconds_per_tick * self.time_denominator)
+            for _, _, seconds_per_tick in segments
+        ]
+
+    def resolution(self, i: int) -> int:
+        return self.resolutions[i] if i < len(self.resolutions) else 1
+
+    def offset(self, i: int) -> int:
+        n = len(self.resolutions)
+        return self.offsets[i] if i <= n else self.offsets[n] + i - n
+
+    def tick(self, bar: Fraction) -> int | None:
+        '''
+        The tick of `bar`, or None if it is not on the tick grid.
+        '''
+        if not isinstance(bar, numbers.Rational):
+            return None
+
+        numerator, denominator = bar.numerator, bar.denominator
+        i = numerator // denominator
+        if i < 0:
+            return None
+
+        ticks, remainder = divmod((numerator - i * denominator) * self.resolution(i), denominator)
+        if remainder:
+            return None
+
+        return self.offset(i) + ticks
+
+    def bar(self, tick: int) -> Fraction:
+        n = len(self.resolutions)
+        if tick >= self.offsets[n]:
+            return Fraction(n + tick - self.offsets[n])
+
+        i = bisect.bisect_right(self.offsets, tick) - 1
+        return i + Fraction(tick - self.offsets[i], self.resolutions[i])
+
+    def get_time_units(self, tick: int) -> int:
+        i = bisect.bisect_right(self.segment_ticks, tick) - 1
+        return self.segment_times[i] + (tick - self.segment_ticks[i]) * self.segment_rates[i]
+
+    def get_time(self, tick: int) -> Fraction:
+        return Fraction(self.get_time_units(tick), self.time_denominator)
+
+    def get_time_delta(self, tick_from: int, tick_to: int) -> Fraction:
+        return Fraction(self.get_time_units(tick_to) - self.get_time_units(tick_from), self.time_denominator)
@@ -0,0 +1,124 @@
+import io
+import os
+import copy
+import re
+import functools
+import multiprocessing
+import concurrent.futures
+import xml.etree.ElementTree
+
+import pytest
+
+from sekaiworld.scores import *
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+
+@pytest.fixture(scope='module')
+def score() -> Score:
+    return Score.open(os.path.join(DATA, 'chart.sus'), encoding='UTF-8')
+
+
+def _numbers(element: xml.etree.ElementTree.Element) -> tuple[str, list[float]]:
+    # the element with every number in its attributes taken out
+    attributes = ' '.join(f'{key}={value}' for key, value in sorted(element.attrib.items()))
+    numbers = re.findall(r'-?\d+(?:\.\d+)?(?:e-?\d+)?', attributes)
+    return element.tag + re.sub(r'-?\d+(?:\.\d+)?(?:e-?\d+)?', '#', attributes), [float(x) for x in numbers]
+
+
+@pytest.mark.parametrize('skill', [False, True])
+def test_draft_precision_within_1px(score: Score, skill: bool):
+    exact = xml.etree.ElementTree.fromstring(Drawing(score=score, skill=skill).svg().tostring())
+    draft = xml.etree.ElementTree.fromstring(Drawing(score=score, skill=skill, precision='draft').svg().tostring())
+
+    exact_elements, draft_elements = list(exact.iter()), list(draft.iter())
+    assert len(exact_elements) == len(draft_elements)
+
+    for e, d in zip(exact_elements, draft_elements):
+        (exact_shape, exact_numbers), (draft_shape, draft_numbers) = _numbers(e), _numbers(d)
+        assert exact_shape == draft_shape
+        assert e.text == d.text
+        for x, y in zip(exact_numbers, draft_numbers):
+            assert abs(x - y) <= 1, (e.tag, e.attrib, d.attrib)
+
+
+@pytest.mark.parametrize('skill', [False, True])
+def test_tick_layout_matches_exact(score: Score, skill: bool):
+    assert Drawing(score=score, skill=skill, ticks=True).svg().tostring() == Drawing(score=score, skill=skill).svg().tostring()
+
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'skill': True},
+    {'ticks': True},
+    {'precision': 'draft'},
+    {'style_sheet': '.title { font-family: "A & B" }'},
+    {'note_host': 'https://example.com/notes?a="1"&b=<2>'},
+    {'lyric': 'lyric'},
+])
+def test_markup_backend_matches_svgwrite(score: Score, options: dict):
+    if options.get('lyric'):
+        with open(os.path.join(DATA, 'chart.txt'), encoding='UTF-8') as f:
+            options = {**options, 'lyric': Lyric.load(f)}
+
+    expected = Drawing(score=score, **options).svg()
+    actual = Drawing(score=score, backend='markup', **options).svg()
+    assert actual.tostring() == expected.tostring()
+
+    expected_file, actual_file = io.StringIO(), io.StringIO()
+    expected.write(expected_file)
+    actual.write(actual_file)
+    assert actual_file.getvalue() == expected_file.getvalue()
+
+
+def test_markup_backend_matches_svgwrite_sentence(score: Score):
+    assert Drawing(score=score, backend='markup')[2:6].tostring() == Drawing(score=score)[2:6].tostring()
+
+
+def test_reused_drawing_hits_sentence_cache(score: Score, monkeypatch: pytest.MonkeyPatch):
+    from sekaiworld.scores import drawing as drawing_module
+
+    drawn = []
+    render_body = drawing_module._render_body
+    monkeypatch.setattr(drawing_module, '_render_body', lambda drawing, bar: drawn.append(bar) or render_body(drawing, bar))
+
+    cache = SentenceCache()
+    drawing = Drawing(score=score, skill=True, backend='markup', cache=cache)
+
+    first = drawing.svg().tostring()
+    n_sentences = len(drawing.sentence_bars())
+    assert len(drawn) == n_sentences
+    assert first == Drawing(score=score, skill=True).svg().tostring()
+
+    second = drawing.svg().tostring()
+    assert second == first
+    assert len(drawn) == n_sentences
+    assert len(cache.entries) == n_sentences
+
+
+def test_copied_score_draws_like_the_original(score: Score):
+    expected = Drawing(score=score).svg().tostring()
+    assert score.slide_chains
+
+    copied = copy.deepcopy(score)
+    assert 'slide_chains' not in vars(copied)
+    assert Drawing(score=copied).svg().tostring() == expected
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_spawned_workers_match_serial(score: Score, cached: bool, monkeypatch: pytest.MonkeyPatch):
+    # spawn pickles the drawing into every worker, fork would only hide it
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', functools.partial(
+        concurrent.futures.ProcessPoolExecutor, mp_context=multiprocessing.get_context('spawn')))
+
+    options = dict(backend='markup', cache=SentenceCache()) if cached else {}
+    expected = Drawing(score=score, skill=True, **options).svg().tostring()
+    assert Drawing(score=score, skill=True, **options).svg(workers=2).tostring() == expected
+
+
+def test_array_round_trip_draws_like_the_original(score: Score):
+    pytest.importorskip('numpy')
+
+    copied = Score.from_arrays(score.to_arrays(), events=score.events, meta=score.meta)
+    assert len(copied.notes) == len(score.notes)
+    assert Drawing(score=copied).svg().tostring() == Drawing(score=score).svg().tostring()
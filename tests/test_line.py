@@ -0,0 +1,70 @@
+import re
+
+import pytest
+
+from sekaiworld.scores.line import decode_literal, _tokenize
+
+
+@pytest.mark.parametrize('data, expected', [
+    ('"Title"', 'Title'),
+    ("'Title'", 'Title'),
+    ('""', ''),
+    ('"a \\"b\\" c"', 'a "b" c'),
+    ('"tab\\tand \\u3042"', 'tab\tand あ'),
+    ("'it\\'s'", "it's"),
+    ('"it\'s"', "it's"),
+    ('120', 120),
+    ('-3', -3),
+    ('1_000', 1000),
+    ('0', 0),
+    ('1.5', 1.5),
+    ('-.5e3', -500.0),
+    ('2e-1', 0.2),
+    ('(1, 2)', (1, 2)),
+    ('1' * 5000, '1' * 5000),
+    ('"unterminated', '"unterminated'),
+    ('"a" "b"', 'ab'),
+    ('007', '007'),
+    ('1.2.3', '1.2.3'),
+    ('__import__("os")', '__import__("os")'),
+    ('plain text', 'plain text'),
+    ('', ''),
+])
+def test_decode_literal(data: str, expected):
+    assert decode_literal(data) == expected
+    assert type(decode_literal(data)) is type(expected)
+
+
+def _tokenize_by_regex(line: str) -> tuple[str, str, str]:
+    # how lines were split before the fast path
+    if match := re.match(r'^#(\w+)\s+(.*)$', line):
+        return 'meta', *match.groups()
+    if match := re.match(r'^#(\w+):\s*(.*)$', line):
+        return 'score', *match.groups()
+    return 'comment', 'comment', line
+
+
+@pytest.mark.parametrize('line', [
+    '#TITLE "a: b"',
+    '#TITLE  "spaces"',
+    '#TITLE\t"tab"',
+    '#ARTIST a:b',
+    '#00002: 4',
+    '#00002:4',
+    '#00010:1111',
+    '#0001A:  0011',
+    '#BPM01: 120',
+    '#TIL00: "0\'0:1.0, 1\'0:2.0"',
+    '#REQUEST "ticks_per_beat 480"',
+    '#NOSPEED',
+    '#HISPEED 0',
+    '#:data',
+    '# TITLE x',
+    '#A-B: x',
+    '#A b:c',
+    '#タイトル 曲',
+    'TITLE "no hash"',
+    '',
+])
+def test_tokenize_matches_regex(line: str):
+    assert _tokenize(line) == _tokenize_by_regex(line)
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from sekaiworld.scores.__main__ import Batch, Job
+
+
+def test_manifest_resolves_paths_against_its_dir(tmp_path):
+    manifest = tmp_path / 'jobs.json'
+    manifest.write_text(json.dumps([{'score': 'a.sus', 'lyric': None}, {'score': '/abs/b.sus', 'output': 'b.svg'}]))
+
+    assert Batch.load_manifest(str(manifest)) == [
+        Job(score=str(tmp_path / 'a.sus')),
+        Job(score='/abs/b.sus', output=str(tmp_path / 'b.svg')),
+    ]
+
+
+@pytest.mark.parametrize('item, message', [
+    ({'score': 'a.sus', 'lyrics': 'a.txt'}, "unknown key 'lyrics'"),
+    ({'output': 'a.svg'}, 'no "score"'),
+    ({'score': 'a.sus', 'rebase': 1}, "'rebase' that is not a path"),
+])
+def test_manifest_names_the_bad_entry(tmp_path, item: dict, message: str):
+    manifest = tmp_path / 'jobs.json'
+    manifest.write_text(json.dumps([{'score': 'ok.sus'}, item]))
+
+    with pytest.raises(ValueError, match=f'job 1 .*{message}'):
+        Batch.load_manifest(str(manifest))
+
+
+@pytest.mark.parametrize('argv, message', [
+    (['-j', '0', '.'], 'must be at least 1: 0'),
+    (['-j', '-2', '.'], 'must be at least 1: -2'),
+    (['-j', 'x', '.'], 'not a number: x'),
+    (['missing.json'], 'cannot read manifest missing.json'),
+])
+def test_batch_reports_bad_arguments(tmp_path, monkeypatch, capsys, argv: list[str], message: str):
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(SystemExit) as e:
+        Batch.from_args(argv)
+
+    assert e.value.code == 2
+    assert message in capsys.readouterr().err
@@ -0,0 +1,141 @@
+import os
+import random
+
+import pytest
+
+from sekaiworld.scores import *
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+REBASE = {
+    'offset': -0.3,
+    'events': [
+        {'bar': 0, 'bpm': 150, 'barLength': 4},
+        {'bar': 10, 'bpm': 180},
+    ],
+}
+
+
+def test_edited_score_leaves_shared_warp_alone():
+    rebase = Rebase.load_from_dict(REBASE)
+    edited = Score.open(os.path.join(DATA, 'chart.sus'), encoding='UTF-8')
+    other = Score.open(os.path.join(DATA, 'chart.sus'), encoding='UTF-8')
+
+    TimeWarp.cache.clear()
+    TimeWarp.get(rebase, edited.tempo_map).map([Fraction(1)])
+    edited.add_event(Event(bar=Fraction(3), bpm=240))
+
+    # a bar the shared warp has not mapped yet, through the unedited map
+    bar = Fraction(13, 2)
+    warp = TimeWarp.get(rebase, other.tempo_map)
+    assert warp(bar) == TimeWarp(rebase, TempoMap(other.events))(bar)
+
+
+def _chart(seed: int) -> Score:
+    # slides whose points share (bar, lane, width) with taps and directionals,
+    # decorated or not, and a bpm change
+    rng = random.Random(seed)
+    notes = []
+    for channel in range(4):
+        bar = Fraction(rng.randrange(8), 4)
+        decoration = rng.random() < 0.5
+        for i in range(rng.randrange(2, 6)):
+            lane, width = rng.randrange(2, 12), rng.randrange(1, 4)
+            notes.append(Slide(bar=bar, lane=lane, width=width, type=SlideType.START if i == 0 else SlideType.RELAY,
+                               channel=channel, decoration=decoration))
+            for _ in range(rng.randrange(3)):
+                notes.append(rng.choice([
+                    Tap(bar=bar, lane=lane, width=width, type=rng.randrange(1, 5)),
+                    Directional(bar=bar, lane=lane, width=width, type=rng.randrange(1, 7)),
+                ]))
+            bar += Fraction(rng.randrange(1, 8), 8)
+        notes.append(Slide(bar=bar, lane=lane, width=width, type=SlideType.END, channel=channel, decoration=decoration))
+
+    for _ in range(10):
+        notes.append(Tap(bar=Fraction(rng.randrange(40), 8), lane=rng.randrange(2, 12), width=2, type=TapType.TAP))
+
+    score = Score()
+    score.notes = notes
+    score.events = [
+        Event(bar=0, bpm=120, bar_length=4),
+        Event(bar=Fraction(rng.randrange(1, 16), 4), bpm=rng.randrange(60, 240)),
+    ]
+    score._init_notes()
+    score._init_events()
+    return score
+
+
+def _links(score: Score) -> list[tuple]:
+    notes = score.all_notes()
+    indexes = {id(note): i for i, note in enumerate(notes)}
+    return [(repr(note), note.flags, *(
+        indexes[id(link)] if (link := getattr(note, key, None)) is not None else None
+        for key in ('tap', 'directional', 'next', 'head')
+    )) for note in notes]
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_sweep_links_like_relink(seed: int):
+    rebase = Rebase.load_from_dict(REBASE)
+    score = _chart(seed)
+
+    swept, relinked = rebase.sweep(score), rebase.relink(score)
+    assert _links(swept) == _links(relinked)
+    assert list(map(repr, swept.events)) == list(map(repr, relinked.events))
+    assert swept.tick_labels == relinked.tick_labels
+
+
+def test_sweep_draws_like_relink():
+    rebase = Rebase.load_from_dict(REBASE)
+    for score in [Score.open(os.path.join(DATA, 'chart.sus'), encoding='UTF-8'), _chart(37)]:
+        swept, relinked = rebase.sweep(score), rebase.relink(score)
+        assert _links(swept) == _links(relinked)
+        assert Drawing(score=swept).svg().tostring() == Drawing(score=relinked).svg().tostring()
+
+
+def test_difficulties_share_one_warp():
+    rebase = Rebase.load_from_dict(REBASE)
+    scores = [Score.open(os.path.join(DATA, 'chart.sus'), encoding='UTF-8') for _ in range(5)]
+
+    TimeWarp.cache.clear()
+    warps = [TimeWarp.get(rebase, score.tempo_map) for score in scores]
+    assert all(warp is warps[0] for warp in warps)
+    assert len(TimeWarp.cache) == 1
+
+    # what one difficulty mapped, the next one reuses
+    rebase(scores[0])
+    n_bars = len(warps[0].bars)
+    rebase(scores[1])
+    assert len(warps[0].bars) == n_bars
+
+
+def test_warp_cache_evicts_least_recently_used():
+    source = Score.open(os.path.join(DATA, 'chart.sus'), encoding='UTF-8').tempo_map
+    rebases = [Rebase.load_from_dict({**REBASE, 'offset': i / 10}) for i in range(TimeWarp.cache_size + 1)]
+
+    TimeWarp.cache.clear()
+    warps = [TimeWarp.get(rebase, source) for rebase in rebases[:TimeWarp.cache_size]]
+    TimeWarp.get(rebases[0], source)
+    TimeWarp.get(rebases[-1], source)
+
+    assert len(TimeWarp.cache) == TimeWarp.cache_size
+    assert TimeWarp.get(rebases[0], source) is warps[0]
+    assert TimeWarp.get(rebases[1], source) is not warps[1]
+
+
+def test_rebased_lyric_matches_relink():
+    rebase = Rebase.load_from_dict(REBASE)
+    score = Score.open(os.path.join(DATA, 'chart.sus'), encoding='UTF-8')
+    with open(os.path.join(DATA, 'chart.txt'), encoding='UTF-8') as f:
+        lyric = Lyric.load(f)
+
+    TimeWarp.cache.clear()
+    relinked = rebase.relink(score)
+    words = rebase.rebase_lyric(score, lyric).words
+    assert words
+
+    assert [word.text for word in words] == [word.text for word in lyric.words]
+    assert [word.bar for word in words] == [
+        relinked.get_bar_by_time(score.get_time(word.bar) - rebase.offset)
+        for word in lyric.words
+    ]
@@ -0,0 +1,225 @@
+import os
+import json
+import codecs
+import pickle
+import random
+import dataclasses
+
+import pytest
+
+from sekaiworld.scores import *
+from sekaiworld.scores.score import _unlink
+from sekaiworld.scores.cache import _header
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def _fingerprint(notes: list[Note]) -> list[str]:
+    # every note with its links, independent of object identity
+    score = Score()
+    score.notes = notes
+    all_notes = score.all_notes()
+    return sorted(
+        repr(note) + repr(tuple(
+            repr(getattr(note, key, None))
+            for key in ('tap', 'directional', 'next', 'head')
+        ))
+        for note in all_notes
+    )
+
+
+def _rebuild(score: Score) -> list[Note]:
+    rebuilt = Score()
+    rebuilt.notes = [dataclasses.replace(note) for note in score.all_notes()]
+    for note in rebuilt.notes:
+        _unlink(note)
+    rebuilt._init_notes()
+    return rebuilt.notes
+
+
+def _ambiguous(score: Score, note: Note, bar, lane: int | None = None) -> bool:
+    # same-bar ties the linker orders arbitrarily, in a full link as well
+    original, note = note, note if lane is None else dataclasses.replace(note, lane=lane)
+    for other in score.all_notes():
+        if other is original or other.bar != bar:
+            continue
+        if isinstance(note, Slide) and isinstance(other, Slide) and (other.channel, other.decoration) == (note.channel, note.decoration):
+            return True
+        if (other.lane, other.width) == (note.lane, note.width) and not isinstance(other, Tap) and not isinstance(note, Tap):
+            return True
+        if type(other) is type(note) and (other.lane, other.width) == (note.lane, note.width):
+            return True
+    return False
+
+
+def _labels(score: Score) -> dict[int, tuple]:
+    return {id(note): (note.bar, label) for note, label in zip(score.notes, score.tick_labels)}
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_edits_match_full_link(seed: int):
+    score = Score.open(os.path.join(DATA, 'chart.sus'), encoding='UTF-8')
+    rng = random.Random(seed)
+
+    n_edits = 0
+    while n_edits < 100:
+        notes = score.all_notes()
+        op = rng.choice(['add', 'remove', 'move', 'lane'])
+        note, bar = rng.choice(notes), rng.choice(notes).bar
+        # lanes 0 and 1, and 14 and up, are off the playfield
+        lane = rng.randrange(0, 16)
+        if op == 'lane':
+            bar = note.bar
+        if op != 'remove' and _ambiguous(score, note, bar, lane if op == 'lane' else None):
+            continue
+        n_edits += 1
+
+        labels = _labels(score)
+        n_events = len(score.events)
+        if op == 'remove':
+            bar_from, bar_to = score.remove_note(note)
+        elif op == 'move':
+            bar_from, bar_to = score.move_note(note, bar=bar)
+        elif op == 'lane':
+            bar_from, bar_to = score.move_note(note, lane=lane)
+            if not 2 <= lane < 14:
+                assert all(n is not note for n in score.all_notes())
+                assert any(event.bar == note.bar and event.text for event in score.events)
+                assert bar_to is None and len(score.events) >= n_events
+        else:
+            note = dataclasses.replace(note, bar=bar)
+            _unlink(note)
+            bar_from, bar_to = score.add_note(note)
+
+        assert score.notes == sorted(score.notes, key=BaseNote.sort_key)
+        assert _fingerprint(score.notes) == _fingerprint(_rebuild(score))
+
+        # every tick label that changed is within the reported range
+        for key, (note_bar, label) in _labels(score).items():
+            if key in labels and labels[key] != (note_bar, label):
+                assert bar_from <= note_bar and (bar_to is None or note_bar <= bar_to)
+
+
+def test_add_note_range_covers_previous_tick():
+    score = Score()
+    score.notes = [Tap(bar=Fraction(1), lane=4, width=2, type=1), Tap(bar=Fraction(2), lane=4, width=2, type=1)]
+    score._init_notes()
+    assert score.tick_labels[0] == '/1'
+
+    assert score.add_note(Tap(bar=Fraction(9, 8), lane=6, width=2, type=1)) == (1, Fraction(9, 8))
+    assert score.tick_labels[0] == '/8'
+
+
+def test_move_note_checks_fields_and_lanes():
+    score = Score()
+    score.notes = [Tap(bar=Fraction(1), lane=4, width=2, type=1), Tap(bar=Fraction(2), lane=4, width=2, type=1)]
+    score._init_notes()
+    note = score.notes[1]
+
+    with pytest.raises(ValueError, match="'head'"):
+        score.move_note(note, head=note)
+    assert score.notes[1] is note
+
+    assert score.move_note(note, lane=0) == (1, None)
+    assert [n.bar for n in score.notes] == [1]
+    assert [(event.bar, event.text) for event in score.events] == [(2, 'SKILL')]
+
+
+def test_event_edits_match_full_build():
+    score = Score.open(os.path.join(DATA, 'chart.sus'), encoding='UTF-8')
+    score.tempo_map
+
+    event = Event(bar=Fraction(7, 2), bpm=200)
+    for edit in (score.add_event, score.remove_event):
+        edit(event)
+        tempo_map = TempoMap(score.events)
+        assert [score.get_time(bar) for bar in range(20)] == [tempo_map.get_time(bar) for bar in range(20)]
+        assert score.tempo_map.legacy_times == tempo_map.legacy_times
+        assert score.tempo_map.float_times == tempo_map.float_times
+
+
+def test_pickled_long_slide_keeps_links():
+    score = Score()
+    score.notes = [
+        Slide(bar=Fraction(i, 8), lane=2 + i % 12, width=1, type=1 if i == 0 else 2 if i == 1999 else 3)
+        for i in range(2000)
+    ]
+    score._init_notes()
+    score.slide_chains
+
+    copied = pickle.loads(pickle.dumps(score))
+    assert 'slide_chains' not in vars(copied)
+    assert _fingerprint(copied.notes) == _fingerprint(score.notes)
+    assert all(note.head is copied.notes[0] for note in copied.notes)
+    assert copied.slide_chains[-1].bar_to == Fraction(1999, 8)
+
+
+@pytest.mark.parametrize('break_extra', [
+    lambda extra: extra['meta'].update(bogus=1),
+    lambda extra: extra.pop('strings'),
+    lambda extra: extra.update(meta=[]),
+])
+def test_score_cache_reparses_broken_entries(tmp_path, break_extra):
+    file = os.path.join(DATA, 'chart.sus')
+    cache = ScoreCache(str(tmp_path))
+    expected = _fingerprint(cache.open(file).notes)
+
+    with open(file, 'rb') as f:
+        path = cache.path(ScoreCache.key(f.read()))
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    # the entry with its extra json block changed, lengths kept consistent
+    *header, n_extra = _header.unpack_from(data)
+    extra = json.loads(data[-n_extra:])
+    break_extra(extra)
+    extra = json.dumps(extra).encode()
+    with open(path, 'wb') as f:
+        f.write(_header.pack(*header, len(extra)) + data[_header.size:-n_extra] + extra)
+
+    assert _fingerprint(cache.open(file).notes) == expected
+
+
+def test_float_times_match_exact_times():
+    np = pytest.importorskip('numpy')
+    score = Score.open(os.path.join(DATA, 'chart.sus'), encoding='UTF-8')
+
+    exact = score.get_times(exact=True)
+    assert exact == [score.get_time(note.bar) for note in score.notes]
+
+    times = score.get_times()
+    assert times.dtype == np.float64
+    np.testing.assert_allclose(times, [float(t) for t in exact], rtol=0, atol=1e-9)
+
+
+def test_bars_round_trip_through_times():
+    np = pytest.importorskip('numpy')
+    score = Score.open(os.path.join(DATA, 'chart.sus'), encoding='UTF-8')
+
+    bars = np.concatenate([
+        np.array([float(note.bar) for note in score.notes]),
+        np.linspace(0, float(score.notes[-1].bar), 1000),
+    ])
+    np.testing.assert_allclose(score.get_bars(score.get_times(bars)), bars, rtol=0, atol=1e-9)
+
+
+def _parsed(score: Score) -> tuple:
+    return score.meta, _fingerprint(score.notes), [repr(event) for event in score.events]
+
+
+def test_in_memory_constructors_match_open():
+    file = os.path.join(DATA, 'chart.sus')
+    expected = _parsed(Score.open(file, encoding='UTF-8'))
+    with open(file, encoding='UTF-8') as f:
+        text = f.read()
+
+    with open(file, encoding='UTF-8') as f:
+        assert _parsed(Score.from_stream(f)) == expected
+    assert _parsed(Score.from_stream(text.splitlines())) == expected
+    assert _parsed(Score.from_string(text)) == expected
+    assert _parsed(Score.from_bytes(text.encode())) == expected
+    assert _parsed(Score.from_bytes(codecs.BOM_UTF8 + text.replace('\n', '\r\n').encode())) == expected
+
+    # a mark right before a header line, without the comment line first
+    text = text.split('\n', 1)[1]
+    assert _parsed(Score.from_bytes(codecs.BOM_UTF8 + text.encode(), encoding='utf8')) == expected